@@ -3,6 +3,7 @@ from .utils.file_io import *
 from .weight.mapping import *
 from .weight.weight import *
 from .graph.build_callgraph import *
+from .graph.csr import *
 from .graph.plot import *
 from .graph.trace import *
 from .find.match import *
@@ -1,13 +1,22 @@
-from dataclasses import dataclass
-from typing import NewType
+from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import chain
+from typing import NewType, TYPE_CHECKING
+
+import numpy as np
+
+from ..utils.file_io import normalize_path
+
+if TYPE_CHECKING:
+    from scipy.sparse import csc_array, csr_array
 
 FileID = NewType("FileID", int)
 FunctionID = NewType("FunctionID", int)
 CallID = NewType("CallID", int)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class location:
-    """関数・呼び出しの位置情報"""
+    """関数・呼び出しの位置情報（同じ位置のインスタンスは共有されるため不変）"""
 
     fileid: FileID
     startrow: int
@@ -15,6 +24,38 @@ class location:
     endrow: int
     endcolumn: int
 
+@dataclass(frozen=True, slots=True)
+class FunctionColumns:
+    """関数の位置情報を列ごとのint32配列にまとめたもの（関数IDの配列と同じ順序で並ぶ）"""
+
+    func_id: np.ndarray
+    fileid: np.ndarray
+    startrow: np.ndarray
+    startcolumn: np.ndarray
+    endrow: np.ndarray
+    endcolumn: np.ndarray
+
+    @classmethod
+    def from_locations(cls, functions: dict[FunctionID, location]) -> "FunctionColumns":
+        """関数ID -> 位置情報の辞書から作成（辞書中の順番を保つ）"""
+        n_functions = len(functions)
+        func_locs = list(functions.values())
+        
+        def column(values) -> np.ndarray:
+            return np.fromiter(values, dtype=np.int32, count=n_functions)
+        
+        return cls(
+            func_id=column(functions.keys()),
+            fileid=column(loc.fileid for loc in func_locs),
+            startrow=column(loc.startrow for loc in func_locs),
+            startcolumn=column(loc.startcolumn for loc in func_locs),
+            endrow=column(loc.endrow for loc in func_locs),
+            endcolumn=column(loc.endcolumn for loc in func_locs),
+        )
+
+    def __len__(self) -> int:
+        return len(self.func_id)
+
 @dataclass
 class JellyObject:
     """jellyから必要要素を抜き出したオブジェクト"""
@@ -22,11 +63,95 @@ class JellyObject:
     files: dict[FileID, str]
     functions: dict[FunctionID, location]
     calls: dict[CallID, location]
-    fun2fun: list[list[FunctionID, FunctionID]]
-    call2fun: list[list[CallID, FunctionID]]
+    # int32, shape (E, 2)（リストで渡した場合は__post_init__で配列に変換する）
+    fun2fun: np.ndarray  # [呼び出し元関数ID, 呼び出し先関数ID]
+    call2fun: np.ndarray  # [呼び出しID, 呼び出し先関数ID]
+    files_norm: dict[FileID, str] = field(default_factory=dict)  # 正規化済みファイルパス
+
+    def __post_init__(self) -> None:
+        # エッジは (E, 2) のint32配列にそろえる
+        self.fun2fun = np.asarray(self.fun2fun, dtype=np.int32).reshape(-1, 2)
+        self.call2fun = np.asarray(self.call2fun, dtype=np.int32).reshape(-1, 2)
+        
+        # 正規化済みファイルパスが渡されていない場合はここで作成
+        if not self.files_norm:
+            self.files_norm = {
+                file_id: normalize_path(file_path)
+                for file_id, file_path in self.files.items()
+            }
+
+    def __eq__(self, other: object) -> bool:
+        # 配列は==で要素ごとの比較になるため、np.array_equalで比較する
+        if not isinstance(other, JellyObject):
+            return NotImplemented
+        return (
+            self.files == other.files
+            and self.functions == other.functions
+            and self.calls == other.calls
+            and np.array_equal(self.fun2fun, other.fun2fun)
+            and np.array_equal(self.call2fun, other.call2fun)
+            and self.files_norm == other.files_norm
+        )
+
+    @cached_property
+    def _norm_files(self) -> dict[str, FileID]:
+        """正規化したファイルパス -> ファイルIDの逆引き辞書（初回アクセス時に一度だけ構築）"""
+        norm_files: dict[str, FileID] = {}
+        for file_id, norm_path in self.files_norm.items():
+            # 同じパスが複数ある場合は最初のファイルIDを優先
+            norm_files.setdefault(norm_path, file_id)
+        return norm_files
+
+    @cached_property
+    def function_columns(self) -> FunctionColumns:
+        """関数の位置情報の列ごとの配列（初回アクセス時に一度だけ構築）"""
+        return FunctionColumns.from_locations(self.functions)
+
+    @cached_property
+    def _func_index(self) -> dict[tuple[FileID, int, int], FunctionID]:
+        """(ファイルID, 開始行, 終了行) -> 関数IDの索引（初回アクセス時に一度だけ構築）"""
+        func_index: dict[tuple[FileID, int, int], FunctionID] = {}
+        for func_id, loc in self.functions.items():
+            # 同じ位置の関数が複数ある場合は最初の関数IDを優先
+            func_index.setdefault((loc.fileid, loc.startrow, loc.endrow), func_id)
+        return func_index
 
 @dataclass
 class dependMap:
-    """依存関係マップ"""
+    """
+    依存関係マップ
+    
+    caller_matrix・callee_matrixは初回アクセス時にキャッシュされるため、構築後のdependMapは変更しないこと
+    """
+
+    dependMap: dict[(FunctionID, FunctionID), int]
+
+    @cached_property
+    def caller_matrix(self) -> "csr_array":
+        """
+        呼び出し元関数ID（行） x 呼び出し先関数ID（列） の呼び出し回数の疎行列（CSR形式、初回アクセス時に一度だけ構築）
+        
+        行・列の大きさは最大の関数ID + 1で、各行の列は関数ID順に並ぶ
+        """
+        # scipy.sparseは読み込みに時間がかかるため、行列を作るときに初めてimportする
+        from scipy.sparse import csr_array
+        
+        n_pairs = len(self.dependMap)
+        pairs = np.fromiter(
+            chain.from_iterable(self.dependMap), dtype=np.int64, count=2 * n_pairs
+        ).reshape(-1, 2)
+        counts = np.fromiter(self.dependMap.values(), dtype=np.int64, count=n_pairs)
+        n_functions = int(pairs.max()) + 1 if n_pairs else 0
+        
+        matrix = csr_array(
+            (counts, (pairs[:, 0], pairs[:, 1])), shape=(n_functions, n_functions)
+        )
+        matrix.sort_indices()
+        return matrix
 
-    dependMap: dict[(FunctionID, FunctionID), int]
\ No newline at end of file
+    @cached_property
+    def callee_matrix(self) -> "csc_array":
+        """caller_matrixと同じ疎行列のCSC形式（列 = 呼び出し先関数IDごとに呼び出し元を引く、初回アクセス時に一度だけ構築）"""
+        matrix = self.caller_matrix.tocsc()
+        matrix.sort_indices()
+        return matrix
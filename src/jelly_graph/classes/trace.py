@@ -1,7 +1,11 @@
 from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
 from .jelly import FunctionID, location
 
-@dataclass
+@dataclass(slots=True)
 class SrcPathInfo:
     """指定した関数を呼び出している関数の経路情報"""
     path: list[FunctionID]  # 経路（関数IDのリスト）
@@ -9,9 +13,42 @@ class SrcPathInfo:
     root_node: FunctionID  # 根ノード
     parents: dict[FunctionID, location] # 親ノードの経路情報リスト
 
-@dataclass
+@dataclass(slots=True)
 class DstPathInfo:
     """指定した関数が呼び出している関数の経路情報"""
     path: list[FunctionID]  # 経路（関数IDのリスト）
     total_weight: int  # 経路の総重み
     children: dict[FunctionID, location] # 子ノードの経路情報リスト
+
+@dataclass(slots=True)
+class PathStats:
+    """経路の集計情報（件数・総重み・経路長の統計量）"""
+    count: int  # 経路数
+    weight_sum: int  # 全経路の総重みの合計
+    min_weight: int  # 総重みの最小値
+    max_weight: int  # 総重みの最大値
+    length_sum: int  # 全経路の経路長の合計
+    min_length: int  # 経路長の最小値
+    max_length: int  # 経路長の最大値
+
+@dataclass
+class CSRAdjacency:
+    """CSR形式の隣接関係（ノードは0始まりの内部IDで表す）"""
+    indptr: np.ndarray  # int32, 内部ID n の隣接ノードは indices[indptr[n]:indptr[n + 1]]
+    indices: np.ndarray  # int32, 隣接ノードの内部ID
+    weights: np.ndarray  # int64, indicesと同じ位置のエッジの重み
+
+    @cached_property
+    def rows(self) -> tuple[list[int], list[int], list[int]]:
+        """走査用にPythonのリストへ変換した (indptr, indices, weights)（初回アクセス時に一度だけ変換）"""
+        return self.indptr.tolist(), self.indices.tolist(), self.weights.tolist()
+
+@dataclass(slots=True)
+class TraceIndex:
+    """経路探索用にグラフの隣接関係を前計算した索引"""
+    roots: frozenset[FunctionID]  # 根ノード（入次数0）
+    leaves: frozenset[FunctionID]  # 葉ノード（出次数0）
+    node_ids: list[FunctionID]  # 内部ID -> 関数ID
+    node_index: dict[FunctionID, int]  # 関数ID -> 内部ID
+    forward: CSRAdjacency  # 呼び出し先の隣接関係（グラフと同じ順序）
+    reverse: CSRAdjacency  # 呼び出し元の隣接関係（グラフと同じ順序）
@@ -1,6 +1,7 @@
 from pathlib import Path
 
 from ..classes.jelly import FileID, FunctionID, JellyObject
+from ..utils.file_io import normalize_path
 
 
 def match_function(
@@ -21,30 +22,41 @@ def match_function(
     Returns:
         一致する関数ID、見つからない場合はNone
     """
-    # ファイルパスを正規化（先頭の/を削除）
-    target_path_str = str(filepath).lstrip("/")
-    
-    # ファイルIDを探す（相対パスで比較）
-    target_file_id: FileID | None = None
-    for file_id, file_path in jelly_obj.files.items():
-        # 両方のパスから先頭の/を削除して比較
-        normalized_file_path = str(file_path).lstrip("/")
-        if normalized_file_path == target_path_str:
-            target_file_id = file_id
-            break
+    # ファイルパスを正規化（読み込み時と同じ規則）してから検索
+    return match_function_by_key(jelly_obj, normalize_path(filepath), start_row, end_row)
+
+
+def match_function_by_key(
+    jelly_obj: JellyObject,
+    path_key: str,
+    start_row: int,
+    end_row: int,
+) -> FunctionID | None:
+    """
+    正規化済みのファイルパスと行範囲に一致する関数IDを返す
+    
+    呼び出し側でnormalize_pathによる正規化を済ませている場合に使う
+    （多数の行を照合する際に同じパスを何度も正規化しないため）
+    
+    ファイルパス・行範囲の検索はJellyObjectの索引（初回アクセス時に一度だけ構築）を引くだけなので、
+    関数の数によらず1件あたり定数時間で照合できる
+    
+    Args:
+        jelly_obj: JellyObjectインスタンス
+        path_key: normalize_pathで正規化したファイルパス
+        start_row: 関数の開始行
+        end_row: 関数の終了行
+    
+    Returns:
+        一致する関数ID、見つからない場合はNone
+    """
+    # ファイルIDを逆引き辞書から探す（相対パスで比較）
+    target_file_id: FileID | None = jelly_obj._norm_files.get(path_key)
     
     # ファイルが見つからない場合
     if target_file_id is None:
         return None
     
-    # 指定したファイル内で、開始行と終了行が一致する関数を探す
-    for func_id, loc in jelly_obj.functions.items():
-        if (
-            loc.fileid == target_file_id
-            and loc.startrow == start_row
-            and loc.endrow == end_row
-        ):
-            return func_id
-    
-    # 一致する関数が見つからない場合
-    return None
+    # 指定したファイル内で、開始行と終了行が一致する関数を索引から探す
+    # （一致する関数が見つからない場合はNone）
+    return jelly_obj._func_index.get((target_file_id, start_row, end_row))
@@ -1,11 +1,47 @@
+from collections.abc import Iterator
 from pathlib import Path
 
 from ..classes.codeql import CodeQLFunction
 from ..classes.jelly import FunctionID, JellyObject
-from .match import match_function
+from ..utils.file_io import normalize_path
+from .match import match_function_by_key
 from .ql_function import load_codeql
 
 
+def iter_match_codeql_to_jelly(
+    codeql_result: CodeQLFunction,
+    jelly_obj: JellyObject,
+    base_path: str | Path | None = None,
+) -> Iterator[tuple[str, tuple[int, int], FunctionID | None]]:
+    """
+    CodeQL結果とJellyObjectの関数を1行ずつ紐付ける（結果のリストを作らないジェネレータ）
+    
+    Args:
+        codeql_result: CodeQLFunctionオブジェクト
+        jelly_obj: JellyObjectインスタンス
+        base_path: ファイルパスの基準となるディレクトリ（オプション）
+    
+    Yields:
+        (ファイルパス, (開始行, 終了行), FunctionID | None)
+        FunctionIDがNoneの場合は、JellyObject中に対応する関数が存在しない
+    """
+    # ファイルパスはPathで正規化（"./"や連続した"/"を除去）してから照合キーにする
+    # 同じファイルの行は多数あるため、正規化はファイルパスごとに一度だけ行う
+    base = Path(base_path) if base_path is not None else None
+    path_key_cache: dict[str, str] = {}
+    
+    for filepath, (start_row, end_row) in codeql_result.function:
+        path_key = path_key_cache.get(filepath)
+        if path_key is None:
+            full_path = base / filepath.lstrip("/") if base is not None else Path(filepath)
+            path_key = path_key_cache[filepath] = normalize_path(full_path)
+        
+        # 正規化済みのキーで関数IDを検索
+        func_id = match_function_by_key(jelly_obj, path_key, start_row, end_row)
+        
+        yield filepath, (start_row, end_row), func_id
+
+
 def match_codeql_to_jelly(
     codeql_result: CodeQLFunction,
     jelly_obj: JellyObject,
@@ -23,21 +59,31 @@ def match_codeql_to_jelly(
         (ファイルパス, (開始行, 終了行), FunctionID | None) のリスト
         FunctionIDがNoneの場合は、JellyObject中に対応する関数が存在しない
     """
-    results: list[tuple[str, tuple[int, int], FunctionID | None]] = []
+    return list(iter_match_codeql_to_jelly(codeql_result, jelly_obj, base_path))
+
+
+def iter_load_and_match_codeql(
+    csv_filepath: str | Path,
+    jelly_obj: JellyObject,
+    base_path: str | Path | None = None,
+) -> Iterator[tuple[str, tuple[int, int], FunctionID | None]]:
+    """
+    CSVファイルを読み込み、JellyObjectの関数と1行ずつ紐付ける（結果のリストを作らないジェネレータ）
     
-    for filepath, (start_row, end_row) in codeql_result.function:
-        # base_pathが指定されている場合、ファイルパスを絶対パスに変換
-        if base_path is not None:
-            full_path = Path(base_path) / filepath.lstrip("/")
-        else:
-            full_path = Path(filepath)
-        
-        # match_functionを使って関数IDを検索
-        func_id = match_function(jelly_obj, full_path, start_row, end_row)
-        
-        results.append((filepath, (start_row, end_row), func_id))
+    Args:
+        csv_filepath: CodeQL結果CSVファイルのパス
+        jelly_obj: JellyObjectインスタンス
+        base_path: ファイルパスの基準となるディレクトリ（オプション）
     
-    return results
+    Yields:
+        (ファイルパス, (開始行, 終了行), FunctionID | None)
+        FunctionIDがNoneの場合は、JellyObject中に対応する関数が存在しない
+    """
+    # CSVファイルを読み込み
+    codeql_result = load_codeql(csv_filepath)
+    
+    # 紐付けを実行
+    yield from iter_match_codeql_to_jelly(codeql_result, jelly_obj, base_path)
 
 
 def load_and_match_codeql(
@@ -57,11 +103,7 @@ def load_and_match_codeql(
         (ファイルパス, (開始行, 終了行), FunctionID | None) のリスト
         FunctionIDがNoneの場合は、JellyObject中に対応する関数が存在しない
     """
-    # CSVファイルを読み込み
-    codeql_result = load_codeql(csv_filepath)
-    
-    # 紐付けを実行
-    return match_codeql_to_jelly(codeql_result, jelly_obj, base_path)
+    return list(iter_load_and_match_codeql(csv_filepath, jelly_obj, base_path))
 
 
 def get_matched_function_ids(
@@ -80,7 +122,7 @@ def get_matched_function_ids(
     Returns:
         マッチした関数IDのリスト（Noneは除外）
     """
-    results = load_and_match_codeql(csv_filepath, jelly_obj, base_path)
+    results = iter_load_and_match_codeql(csv_filepath, jelly_obj, base_path)
     return [func_id for _, _, func_id in results if func_id is not None]
 
 
@@ -100,7 +142,7 @@ def get_unmatched_functions(
     Returns:
         マッチしなかった(ファイルパス, (開始行, 終了行))のリスト
     """
-    results = load_and_match_codeql(csv_filepath, jelly_obj, base_path)
+    results = iter_load_and_match_codeql(csv_filepath, jelly_obj, base_path)
     return [(filepath, (start_row, end_row)) 
             for filepath, (start_row, end_row), func_id in results 
             if func_id is None]
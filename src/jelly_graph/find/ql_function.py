@@ -1,27 +1,41 @@
 import csv
+import os
+from collections.abc import Iterator
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 
 from ..classes.codeql import CodeQLFunction
 
+# CodeQL結果CSVを読み込む際のバッファサイズ
+_READ_BUFFER_SIZE = 1 << 20
 
-def load_codeql(filepath: str | Path) -> CodeQLFunction:
+# 解析済みのCodeQL結果を保持するファイル数
+_PARSE_CACHE_SIZE = 8
+
+
+def iter_codeql_rows(filepath: str | Path) -> Iterator[tuple[str, tuple[int, int]]]:
     """
-    CodeQL結果のCSVファイルを読み込み、CodeQLFunctionオブジェクトを返す
+    CodeQL結果のCSVファイルを1行ずつ読み込むジェネレータ（ファイル全体をメモリに載せない）
     
     Args:
         filepath: CodeQL結果CSVファイルのパス
     
-    Returns:
-        CodeQLFunctionオブジェクト
+    Yields:
+        (ファイルパス, (開始行, 終了行))
         
     CSVフォーマット:
         - 5列目: ファイルパス
         - 6列目: 開始行
         - 8列目: 終了行
     """
-    functions: list[tuple[str, tuple[int, int]]] = []
+    # ループ内で使う関数をローカル変数に束縛しておく
+    # 5列目(インデックス4): ファイルパス, 6列目(インデックス5): 開始行, 8列目(インデックス7): 終了行
+    get_columns = itemgetter(4, 5, 7)
     
-    with open(filepath, "r", encoding="utf-8") as f:
+    # 大きなCSVでも読み込みのシステムコールが少なくなるよう1MiBのバッファを使う
+    # （newline=""はcsvモジュールの推奨どおり改行の解釈をcsv.readerに任せるため）
+    with open(filepath, "r", encoding="utf-8", newline="", buffering=_READ_BUFFER_SIZE) as f:
         csv_reader = csv.reader(f)
         
         for row in csv_reader:
@@ -29,23 +43,56 @@ def load_codeql(filepath: str | Path) -> CodeQLFunction:
                 # 列数が不足している行はスキップ
                 continue
             
-            # 5列目(インデックス4): ファイルパス
-            file_path = row[4]
-            
-            # 6列目(インデックス5): 開始行
+            file_path, start_row, end_row = get_columns(row)
             try:
-                start_row = int(row[5])
+                rows = (int(start_row), int(end_row))
             except ValueError:
                 # 数値に変換できない場合はスキップ
                 continue
-            
-            # 8列目(インデックス7): 終了行
-            try:
-                end_row = int(row[7])
-            except ValueError:
-                # 数値に変換できない場合はスキップ
-                continue
-            
-            functions.append((file_path, (start_row, end_row)))
+            yield file_path, rows
+
+
+@lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def _parse_ql_csv_cached(
+    filepath: str, mtime_ns: int, size: int
+) -> tuple[tuple[str, tuple[int, int]], ...]:
+    """更新時刻・サイズをキーに含めた解析結果のキャッシュ（ファイルが変更されると読み直す）"""
+    return tuple(iter_codeql_rows(filepath))
+
+
+def parse_ql_csv(filepath: str | Path) -> tuple[tuple[str, tuple[int, int]], ...]:
+    """
+    CodeQL結果のCSVファイルを解析する（同じファイルの解析はプロセス内で一度だけ行う）
+    
+    キャッシュはファイルの更新時刻とサイズをキーに含むため、ファイルが変更された場合は読み直す。
+    
+    Args:
+        filepath: CodeQL結果CSVファイルのパス
     
-    return CodeQLFunction(function=functions)
+    Returns:
+        (ファイルパス, (開始行, 終了行)) のタプル（キャッシュを共有するため不変）
+    """
+    path = os.path.realpath(filepath)
+    stat = os.stat(path)
+    return _parse_ql_csv_cached(path, stat.st_mtime_ns, stat.st_size)
+
+
+def load_codeql(filepath: str | Path) -> CodeQLFunction:
+    """
+    CodeQL結果のCSVファイルを読み込み、CodeQLFunctionオブジェクトを返す
+    
+    解析結果はparse_ql_csvでキャッシュされるため、同じファイルを何度読み込んでも解析は一度だけ行う。
+    
+    Args:
+        filepath: CodeQL結果CSVファイルのパス
+    
+    Returns:
+        CodeQLFunctionオブジェクト
+        
+    CSVフォーマット:
+        - 5列目: ファイルパス
+        - 6列目: 開始行
+        - 8列目: 終了行
+    """
+    # 呼び出し側が変更してもキャッシュに影響しないよう、リストにコピーして渡す
+    return CodeQLFunction(function=list(parse_ql_csv(filepath)))
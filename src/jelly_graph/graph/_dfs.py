@@ -0,0 +1,87 @@
+from array import array
+
+
+def enumerate_paths(
+    indptr: list[int],
+    indices: list[int],
+    weights: list[int],
+    start: int,
+    max_depth: int,
+) -> tuple[array, array, list[int]]:
+    """
+    CSR形式の隣接関係上で、開始ノードから終端ノード（行が空のノード）までの全経路を列挙
+    
+    整数の配列だけを扱う深さ優先探索のカーネル（関数IDやlocationへの変換は呼び出し側で行う）。
+    同じ経路上のノードは再訪しない（循環は辿らない）。
+    
+    見つかった経路は経路ごとのリストを作らず、1つの連続したint32配列に連結して格納する
+    （経路数が多い場合でも小さなオブジェクトを大量に確保しない）。
+    
+    Args:
+        indptr: CSRの行の開始位置（内部ID n の隣接ノードは indices[indptr[n]:indptr[n + 1]]）
+        indices: 隣接ノードの内部ID
+        weights: indicesと同じ位置のエッジの重み
+        start: 開始ノードの内部ID
+        max_depth: 経路に含められるノード数の上限
+    
+    Returns:
+        (paths_flat, path_offsets, path_weights)
+        - paths_flat: 全経路の内部IDを連結したint32配列
+        - path_offsets: k番目の経路は paths_flat[path_offsets[k]:path_offsets[k + 1]]
+        - path_weights: k番目の経路の総重み
+    """
+    paths_flat = array("i")
+    path_offsets = array("q", [0])
+    path_weights: list[int] = []
+    
+    if max_depth < 1:
+        return paths_flat, path_offsets, path_weights
+    
+    # 現在の経路と、各深さで次に調べるエッジの位置・そこまでの総重み
+    path: list[int] = [start]
+    next_edge: list[int] = [indptr[start]]
+    weight_sum: list[int] = [0]
+    # 循環検出用のフラグ（内部IDで引く。集合のハッシュ計算を避ける）
+    in_path = bytearray(len(indptr) - 1)
+    in_path[start] = 1
+    
+    while path:
+        node = path[-1]
+        pos = next_edge[-1]
+        
+        # 隣接ノードを探索し尽くした場合は1つ戻る
+        if pos == indptr[node + 1]:
+            path.pop()
+            next_edge.pop()
+            weight_sum.pop()
+            in_path[node] = 0
+            continue
+        
+        next_edge[-1] = pos + 1
+        neighbor = indices[pos]
+        
+        # 循環検出：既に現在の経路で訪問済みの場合はスキップ
+        if in_path[neighbor]:
+            continue
+        
+        # 最大深度チェック
+        if len(path) >= max_depth:
+            continue
+        
+        total_weight = weight_sum[-1] + weights[pos]
+        
+        # 終端ノード（隣接ノードがない）に到達した場合は経路を記録
+        if indptr[neighbor] == indptr[neighbor + 1]:
+            paths_flat.extend(path)
+            paths_flat.append(neighbor)
+            path_offsets.append(len(paths_flat))
+            path_weights.append(total_weight)
+            continue
+        
+        # 隣接ノードへ進む
+        path.append(neighbor)
+        next_edge.append(indptr[neighbor])
+        weight_sum.append(total_weight)
+        in_path[neighbor] = 1
+    
+    return paths_flat, path_offsets, path_weights
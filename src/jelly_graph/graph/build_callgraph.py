@@ -19,16 +19,34 @@ def build_callgraph(depend_map: dependMap) -> nx.DiGraph:
     # 有向グラフを作成
     graph = nx.DiGraph()
     
-    # 依存関係マップの各エントリをエッジとして追加
-    for (src_func_id, dst_func_id), weight in depend_map.dependMap.items():
-        # エッジを追加（weightは呼び出し回数）
-        graph.add_edge(src_func_id, dst_func_id, weight=weight)
+    # 依存関係マップの各エントリをエッジとして一括追加（weightは呼び出し回数）
+    graph.add_weighted_edges_from(
+        (src_func_id, dst_func_id, weight)
+        for (src_func_id, dst_func_id), weight in depend_map.dependMap.items()
+    )
     
     return graph
 
 
+def _node_metadata(jelly_obj: JellyObject, func_id: FunctionID) -> dict[str, Any]:
+    """関数のノード属性（ファイル名、行範囲など）を作成（位置情報がない場合は空）"""
+    loc = jelly_obj.functions.get(func_id)
+    if loc is None:
+        return {}
+    return {
+        "file": jelly_obj.files.get(loc.fileid, "不明"),
+        "start_row": loc.startrow,
+        "end_row": loc.endrow,
+        "start_col": loc.startcolumn,
+        "end_col": loc.endcolumn,
+        "lines": loc.endrow - loc.startrow + 1,
+    }
+
+
 def build_meta_callgraph(
-    depend_map: dependMap, jelly_obj: JellyObject
+    depend_map: dependMap,
+    jelly_obj: JellyObject,
+    base: nx.DiGraph | None = None,
 ) -> nx.DiGraph:
     """
     メタデータ付きの重み付き有向グラフを構築
@@ -36,33 +54,39 @@ def build_meta_callgraph(
     Args:
         depend_map: 依存関係マップ
         jelly_obj: JellyObjectインスタンス（メタデータ取得用）
+        base: 同じdepend_mapからbuild_callgraphで構築済みのグラフ（オプション）
+              指定した場合はエッジを作り直さず、コピーにノード属性を付ける（baseは変更しない）
     
     Returns:
         NetworkXの有向グラフ（DiGraph）
         - ノード属性: ファイル名、行範囲など
         - エッジ属性: 呼び出し回数（weight）
     """
+    if base is not None:
+        # 構築済みのグラフをコピーし、各ノードに属性を付ける
+        graph = base.copy()
+        for func_id, attrs in graph.nodes(data=True):
+            attrs.update(_node_metadata(jelly_obj, func_id))
+        return graph
+    
     # 有向グラフを作成
     graph = nx.DiGraph()
     
-    # 依存関係マップの各エントリをエッジとして追加
+    # 依存関係マップを一度だけ走査し、エッジの収集と初出ノードのメタデータ作成を同時に行う
+    # （ノードはエッジ追加時と同じ初出順で並ぶ）
+    node_attrs: dict[FunctionID, dict[str, Any]] = {}
+    edges: list[tuple[FunctionID, FunctionID, int]] = []
     for (src_func_id, dst_func_id), weight in depend_map.dependMap.items():
-        # エッジを追加
-        graph.add_edge(src_func_id, dst_func_id, weight=weight)
-    
-    # ノードにメタデータを追加
-    for func_id in graph.nodes():
-        if func_id in jelly_obj.functions:
-            loc = jelly_obj.functions[func_id]
-            file_path = jelly_obj.files.get(loc.fileid, "不明")
-            
-            # ノード属性を設定
-            graph.nodes[func_id]["file"] = file_path
-            graph.nodes[func_id]["start_row"] = loc.startrow
-            graph.nodes[func_id]["end_row"] = loc.endrow
-            graph.nodes[func_id]["start_col"] = loc.startcolumn
-            graph.nodes[func_id]["end_col"] = loc.endcolumn
-            graph.nodes[func_id]["lines"] = loc.endrow - loc.startrow + 1
+        for func_id in (src_func_id, dst_func_id):
+            if func_id not in node_attrs:
+                # ノード属性を作成
+                node_attrs[func_id] = _node_metadata(jelly_obj, func_id)
+        
+        edges.append((src_func_id, dst_func_id, weight))
+    
+    # ノード（属性付き）とエッジをそれぞれ一括追加
+    graph.add_nodes_from(node_attrs.items())
+    graph.add_weighted_edges_from(edges)
     
     return graph
 
@@ -87,16 +111,40 @@ def get_node_statistics(graph: nx.DiGraph, node_id: FunctionID) -> dict[str, Any
     }
     
     # 重み付き次数（実際の呼び出し回数の合計）
-    stats["weighted_in_degree"] = sum(
-        data.get("weight", 0) for _, _, data in graph.in_edges(node_id, data=True)
-    )
-    stats["weighted_out_degree"] = sum(
-        data.get("weight", 0) for _, _, data in graph.out_edges(node_id, data=True)
-    )
+    # EdgeDataViewを経由せず隣接辞書から直接合計する
+    stats["weighted_in_degree"] = graph.in_degree(node_id, weight="weight")
+    stats["weighted_out_degree"] = graph.out_degree(node_id, weight="weight")
     
     return stats
 
 
+def get_all_node_statistics(graph: nx.DiGraph) -> dict[FunctionID, dict[str, Any]]:
+    """
+    全ノード（関数）の統計情報をまとめて取得
+    
+    get_node_statistics をノードごとに呼び出す代わりに、次数を全ノード分一括で計算する
+    
+    Args:
+        graph: NetworkXの有向グラフ
+    
+    Returns:
+        関数ID -> ノードの統計情報（get_node_statisticsと同じキー）の辞書
+    """
+    in_degree = dict(graph.in_degree())
+    out_degree = dict(graph.out_degree())
+    weighted_in_degree = dict(graph.in_degree(weight="weight"))
+    weighted_out_degree = dict(graph.out_degree(weight="weight"))
+    
+    return {
+        node: {
+            "in_degree": in_degree[node],
+            "out_degree": out_degree[node],
+            "weighted_in_degree": weighted_in_degree[node],
+            "weighted_out_degree": weighted_out_degree[node],
+        }
+        for node in graph.nodes()
+    }
+
 
 def filter_graph_by_file(
     graph: nx.DiGraph, file_id_or_path: int | str
@@ -111,19 +159,25 @@ def filter_graph_by_file(
     Returns:
         フィルタリングされたサブグラフ
     """
-    # フィルタ対象のノードを選択
+    # 判定条件はループの外で一度だけ決める
     if isinstance(file_id_or_path, int):
         # ファイルIDで比較（メタデータが必要）
-        nodes_to_keep = [
-            node for node in graph.nodes()
-            if graph.nodes[node].get("file", "").endswith(str(file_id_or_path))
-        ]
+        suffix = str(file_id_or_path)
+        is_match = lambda file_path: file_path.endswith(suffix)
     else:
         # ファイルパスで比較
-        nodes_to_keep = [
-            node for node in graph.nodes()
-            if file_id_or_path in graph.nodes[node].get("file", "")
-        ]
+        is_match = lambda file_path: file_id_or_path in file_path
+    
+    # 現在のノード属性を1回の走査で取得し、判定はファイルパス（ユニーク）ごとに一度だけ行う
+    # （file属性はノード属性辞書を経由せずまとめて取得）
+    matched_by_file: dict[str, bool] = {}
+    nodes_to_keep: list[FunctionID] = []
+    for node, file_path in graph.nodes(data="file", default=""):
+        matched = matched_by_file.get(file_path)
+        if matched is None:
+            matched = matched_by_file[file_path] = is_match(file_path)
+        if matched:
+            nodes_to_keep.append(node)
     
     return graph.subgraph(nodes_to_keep).copy()
 
@@ -132,6 +186,9 @@ def calculate_pagerank(graph: nx.DiGraph, weight_key: str = "weight") -> dict[Fu
     """
     PageRankアルゴリズムで関数の重要度を計算
     
+    nx.pagerankは隣接行列をSciPyの疎行列に変換して計算する。
+    同じグラフのスコアを何度も使う場合は、呼び出し側で結果を保持すること。
+    
     Args:
         graph: NetworkXの有向グラフ
         weight_key: 重みのキー（デフォルト: "weight"）
@@ -140,5 +197,3 @@ def calculate_pagerank(graph: nx.DiGraph, weight_key: str = "weight") -> dict[Fu
         関数ID -> PageRankスコアの辞書
     """
     return nx.pagerank(graph, weight=weight_key)
-
-
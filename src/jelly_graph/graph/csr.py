@@ -0,0 +1,62 @@
+import networkx as nx
+import numpy as np
+from collections.abc import Mapping
+
+from ..classes.jelly import FunctionID
+from ..classes.trace import CSRAdjacency
+
+
+def build_csr(
+    graph: nx.DiGraph,
+) -> tuple[list[FunctionID], CSRAdjacency, CSRAdjacency]:
+    """
+    有向グラフをCSR形式（呼び出し先・呼び出し元の2方向）に変換
+    
+    各ノードの隣接ノードはNetworkXのsuccessors/predecessorsと同じ順序で並ぶ。
+    
+    Args:
+        graph: NetworkXの有向グラフ（重み付き、重みがないエッジは1として扱う）
+    
+    Returns:
+        (内部ID -> 関数IDのリスト, 呼び出し先のCSR, 呼び出し元のCSR)
+    """
+    node_ids: list[FunctionID] = list(graph.nodes())
+    node_index = {node: i for i, node in enumerate(node_ids)}
+    
+    forward = _adjacency_to_csr(graph.succ, node_index)
+    reverse = _adjacency_to_csr(graph.pred, node_index)
+    
+    return node_ids, forward, reverse
+
+
+def _adjacency_to_csr(
+    adjacency: Mapping[FunctionID, Mapping[FunctionID, dict]],
+    node_index: dict[FunctionID, int],
+) -> CSRAdjacency:
+    """ノード順に並んだ隣接辞書（graph.succ / graph.pred）をCSR形式に変換"""
+    n_nodes = len(adjacency)
+    
+    # 各行の長さ（次数）の累積和から行の開始位置を作る
+    degrees = np.fromiter(
+        (len(neighbors) for neighbors in adjacency.values()), dtype=np.int32, count=n_nodes
+    )
+    indptr = np.zeros(n_nodes + 1, dtype=np.int32)
+    np.cumsum(degrees, out=indptr[1:])
+    n_edges = int(indptr[-1])
+    
+    indices = np.fromiter(
+        (node_index[neighbor] for neighbors in adjacency.values() for neighbor in neighbors),
+        dtype=np.int32,
+        count=n_edges,
+    )
+    weights = np.fromiter(
+        (
+            data.get("weight", 1)
+            for neighbors in adjacency.values()
+            for data in neighbors.values()
+        ),
+        dtype=np.int64,
+        count=n_edges,
+    )
+    
+    return CSRAdjacency(indptr=indptr, indices=indices, weights=weights)
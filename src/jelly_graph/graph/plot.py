@@ -1,11 +1,91 @@
 import networkx as nx
-from typing import Any
+from typing import Any, TYPE_CHECKING
 from pathlib import Path
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
+import numpy as np
 
 from ..classes.jelly import dependMap, FunctionID, JellyObject
 
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+
+# エッジを矢印（1本ずつのパッチ）で描画する最大エッジ数（超える場合は線分をまとめて描画する）
+_MAX_ARROW_EDGES = 2000
+
+
+def _draw_edges(
+    ax: "Axes",
+    graph: nx.DiGraph,
+    pos: dict[Any, Any],
+    edge_widths: list[float],
+    arrowsize: int,
+) -> None:
+    """
+    エッジを描画（エッジ数が多い場合は矢印を省き、LineCollectionで一括描画する）
+    
+    Args:
+        ax: 描画先のAxes
+        graph: NetworkXの有向グラフ
+        pos: ノード -> 座標 の辞書
+        edge_widths: graph.edges()の順に並んだエッジの太さ
+        arrowsize: 矢印の大きさ（矢印で描画する場合のみ）
+    """
+    if graph.number_of_edges() <= _MAX_ARROW_EDGES:
+        nx.draw_networkx_edges(
+            graph,
+            pos,
+            width=edge_widths,
+            alpha=0.5,
+            edge_color="gray",
+            arrows=True,
+            arrowsize=arrowsize,
+            arrowstyle="->",
+            connectionstyle="arc3,rad=0.1",
+            ax=ax,
+        )
+        return
+    
+    from matplotlib.collections import LineCollection
+    
+    # 矢印はエッジごとにパッチを作るため、大きなグラフでは (E, 2, 2) の線分配列から一度に描画する
+    segments = np.array([(pos[u], pos[v]) for u, v in graph.edges()], dtype=float)
+    ax.add_collection(
+        LineCollection(segments, linewidths=edge_widths, colors="gray", alpha=0.5, zorder=1)
+    )
+    ax.autoscale_view()
+
+
+def compute_layout(
+    graph: nx.DiGraph,
+    layout: str = "spring",
+    spring_k: float = 1.5,
+) -> dict[Any, Any]:
+    """
+    コールグラフのノード配置を計算
+    
+    同じグラフを複数回描画する場合は、一度計算した配置を各保存関数のposに渡して再利用できる
+    
+    Args:
+        graph: NetworkXの有向グラフ
+        layout: レイアウトアルゴリズム（save_callgraph_imageと同じ、不明な場合は"spring"）
+        spring_k: springレイアウトのノード間の距離
+    
+    Returns:
+        ノード -> 座標 の辞書
+    """
+    if layout == "circular":
+        return nx.circular_layout(graph)
+    if layout == "kamada_kawai":
+        return nx.kamada_kawai_layout(graph)
+    if layout == "planar":
+        try:
+            return nx.planar_layout(graph)
+        except nx.NetworkXException:
+            # 平面グラフでない場合はspringに戻す
+            pass
+    elif layout == "shell":
+        return nx.shell_layout(graph)
+    return nx.spring_layout(graph, k=spring_k, iterations=50, seed=42)
+
 
 def save_callgraph_image(
     graph: nx.DiGraph,
@@ -17,6 +97,8 @@ def save_callgraph_image(
     show_labels: bool = True,
     title: str | None = None,
     dpi: int = 300,
+    pos: dict[Any, Any] | None = None,
+    ax: "Axes | None" = None,
 ) -> None:
     """
     コールグラフを画像として保存
@@ -36,44 +118,37 @@ def save_callgraph_image(
         show_labels: ノードラベル（関数ID）を表示するか
         title: グラフのタイトル
         dpi: 画像の解像度
+        pos: compute_layoutで計算済みのノード配置（指定した場合layoutは使わない）
+        ax: 描画先のAxes（オプション）
+            指定した場合は新しい図を作らずにaxへ描画して保存し、図は閉じない（figsizeは使わない）。
+            複数の画像を続けて出力する場合は、ax.clear()してから渡すと図を使い回せる
     """
-    # レイアウトを計算
-    if layout == "spring":
-        pos = nx.spring_layout(graph, k=1.5, iterations=50, seed=42)
-    elif layout == "circular":
-        pos = nx.circular_layout(graph)
-    elif layout == "kamada_kawai":
-        pos = nx.kamada_kawai_layout(graph)
-    elif layout == "planar":
-        try:
-            pos = nx.planar_layout(graph)
-        except nx.NetworkXException:
-            # 平面グラフでない場合はspringに戻す
-            pos = nx.spring_layout(graph, k=1.5, iterations=50, seed=42)
-    elif layout == "shell":
-        pos = nx.shell_layout(graph)
+    # レイアウトを計算（計算済みの配置が渡された場合はそれを使う）
+    if pos is None:
+        pos = compute_layout(graph, layout)
+    
+    # matplotlibは読み込みに時間がかかるため、描画するときに初めてimportする
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+    
+    # 図を作成（描画先が渡された場合はその図を使う）
+    reuse_figure = ax is not None
+    if ax is None:
+        fig, ax = plt.subplots(figsize=figsize)
     else:
-        pos = nx.spring_layout(graph, k=1.5, iterations=50, seed=42)
+        fig = ax.figure
     
-    # 図を作成
-    plt.figure(figsize=figsize)
+    # 重み付き入次数・出次数を全ノード分まとめて計算
+    weighted_in = dict(graph.in_degree(weight="weight"))
+    weighted_out = dict(graph.out_degree(weight="weight"))
     
-    # ノードサイズを重み付き入次数に基づいて計算
-    node_sizes = []
-    for node in graph.nodes():
-        weighted_in = sum(
-            data.get("weight", 1) for _, _, data in graph.in_edges(node, data=True)
-        )
-        # 最小サイズを保証
-        node_sizes.append(max(300, weighted_in * node_size_multiplier))
+    # ノードサイズを重み付き入次数に基づいて計算（最小サイズを保証）
+    node_sizes = [
+        max(300, weighted_in[node] * node_size_multiplier) for node in graph.nodes()
+    ]
     
     # ノードの色を重み付き出次数に基づいて計算
-    node_colors = []
-    for node in graph.nodes():
-        weighted_out = sum(
-            data.get("weight", 1) for _, _, data in graph.out_edges(node, data=True)
-        )
-        node_colors.append(weighted_out)
+    node_colors = [weighted_out[node] for node in graph.nodes()]
     
     # ノードを描画
     nx.draw_networkx_nodes(
@@ -85,27 +160,23 @@ def save_callgraph_image(
         alpha=0.8,
         edgecolors="black",
         linewidths=1.5,
+        ax=ax,
     )
     
     # エッジを描画（重みに応じて太さを変える）
-    edges = graph.edges()
-    weights = [graph[u][v].get("weight", 1) for u, v in edges]
+    # エッジを1回だけ走査し、重み（太さ用）とラベルを同時に集める
+    weights = []
+    edge_labels = {}
+    for u, v, d in graph.edges(data=True):
+        weights.append(d.get("weight", 1))
+        if show_weights and d.get("weight", 0) > 0:
+            edge_labels[(u, v)] = str(d["weight"])
     max_weight = max(weights) if weights else 1
     
     # 重みに応じてエッジの太さを調整
     edge_widths = [1 + (w / max_weight) * 4 for w in weights]
     
-    nx.draw_networkx_edges(
-        graph,
-        pos,
-        width=edge_widths,
-        alpha=0.5,
-        edge_color="gray",
-        arrows=True,
-        arrowsize=20,
-        arrowstyle="->",
-        connectionstyle="arc3,rad=0.1",
-    )
+    _draw_edges(ax, graph, pos, edge_widths, arrowsize=20)
     
     # ノードラベルを描画
     if show_labels:
@@ -115,28 +186,25 @@ def save_callgraph_image(
             font_size=8,
             font_weight="bold",
             font_color="black",
+            ax=ax,
         )
     
     # エッジラベル（重み）を描画
     if show_weights:
-        edge_labels = {
-            (u, v): f"{d['weight']}"
-            for u, v, d in graph.edges(data=True)
-            if d.get("weight", 0) > 0
-        }
         nx.draw_networkx_edge_labels(
             graph,
             pos,
             edge_labels,
             font_size=6,
             bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.7),
+            ax=ax,
         )
     
     # タイトルを設定
     if title:
-        plt.title(title, fontsize=16, fontweight="bold", pad=20)
+        ax.set_title(title, fontsize=16, fontweight="bold", pad=20)
     else:
-        plt.title(
+        ax.set_title(
             f"コールグラフ ({graph.number_of_nodes()} 関数, {graph.number_of_edges()} 依存関係)",
             fontsize=16,
             fontweight="bold",
@@ -149,19 +217,20 @@ def save_callgraph_image(
         mpatches.Patch(color="white", label=f"ノード色: 呼び出した回数（赤いほど多い）"),
         mpatches.Patch(color="white", label=f"エッジ太さ: 呼び出し回数"),
     ]
-    plt.legend(
+    ax.legend(
         handles=legend_elements,
         loc="upper left",
         framealpha=0.9,
         fontsize=10,
     )
     
-    plt.axis("off")
-    plt.tight_layout()
+    ax.set_axis_off()
+    fig.tight_layout()
     
-    # 保存
-    plt.savefig(output_path, dpi=dpi, bbox_inches="tight", facecolor="white")
-    plt.close()
+    # 保存（この関数で作成した図だけを閉じる）
+    fig.savefig(output_path, dpi=dpi, bbox_inches="tight", facecolor="white")
+    if not reuse_figure:
+        plt.close(fig)
 
 
 def save_callgraph_with_metadata(
@@ -174,6 +243,8 @@ def save_callgraph_with_metadata(
     show_weights: bool = True,
     title: str | None = None,
     dpi: int = 300,
+    pos: dict[Any, Any] | None = None,
+    ax: "Axes | None" = None,
 ) -> None:
     """
     メタデータ付きコールグラフを画像として保存（ファイル名付き）
@@ -188,32 +259,33 @@ def save_callgraph_with_metadata(
         show_weights: エッジの重みを表示するか
         title: グラフのタイトル
         dpi: 画像の解像度
+        pos: compute_layoutで計算済みのノード配置（指定した場合layoutは使わない）
+        ax: 描画先のAxes（オプション）
+            指定した場合は新しい図を作らずにaxへ描画して保存し、図は閉じない（figsizeは使わない）。
+            複数の画像を続けて出力する場合は、ax.clear()してから渡すと図を使い回せる
     """
-    # レイアウトを計算
-    if layout == "spring":
-        pos = nx.spring_layout(graph, k=2, iterations=50, seed=42)
-    elif layout == "circular":
-        pos = nx.circular_layout(graph)
-    elif layout == "kamada_kawai":
-        pos = nx.kamada_kawai_layout(graph)
+    # レイアウトを計算（計算済みの配置が渡された場合はそれを使う）
+    # planar・shellには対応せず、springで配置する
+    if pos is None:
+        if layout not in ("spring", "circular", "kamada_kawai"):
+            layout = "spring"
+        pos = compute_layout(graph, layout, spring_k=2)
+    
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+    
+    # 図を作成（描画先が渡された場合はその図を使う）
+    reuse_figure = ax is not None
+    if ax is None:
+        fig, ax = plt.subplots(figsize=figsize)
     else:
-        pos = nx.spring_layout(graph, k=2, iterations=50, seed=42)
-    
-    # 図を作成
-    plt.figure(figsize=figsize)
+        fig = ax.figure
     
-    # ノードサイズとカラーを計算
-    node_sizes = []
-    node_colors = []
-    for node in graph.nodes():
-        weighted_in = sum(
-            data.get("weight", 1) for _, _, data in graph.in_edges(node, data=True)
-        )
-        weighted_out = sum(
-            data.get("weight", 1) for _, _, data in graph.out_edges(node, data=True)
-        )
-        node_sizes.append(max(500, weighted_in * 200))
-        node_colors.append(weighted_out)
+    # ノードサイズとカラーを計算（重み付き次数は全ノード分まとめて取得）
+    weighted_in = dict(graph.in_degree(weight="weight"))
+    weighted_out = dict(graph.out_degree(weight="weight"))
+    node_sizes = [max(500, weighted_in[node] * 200) for node in graph.nodes()]
+    node_colors = [weighted_out[node] for node in graph.nodes()]
     
     # ノードを描画
     nx.draw_networkx_nodes(
@@ -225,25 +297,21 @@ def save_callgraph_with_metadata(
         alpha=0.8,
         edgecolors="black",
         linewidths=2,
+        ax=ax,
     )
     
     # エッジを描画
-    edges = graph.edges()
-    weights = [graph[u][v].get("weight", 1) for u, v in edges]
+    # エッジを1回だけ走査し、重み（太さ用）とラベルを同時に集める
+    weights = []
+    edge_labels = {}
+    for u, v, d in graph.edges(data=True):
+        weights.append(d.get("weight", 1))
+        if show_weights and d.get("weight", 0) > 0:
+            edge_labels[(u, v)] = str(d["weight"])
     max_weight = max(weights) if weights else 1
     edge_widths = [1 + (w / max_weight) * 5 for w in weights]
     
-    nx.draw_networkx_edges(
-        graph,
-        pos,
-        width=edge_widths,
-        alpha=0.5,
-        edge_color="gray",
-        arrows=True,
-        arrowsize=25,
-        arrowstyle="->",
-        connectionstyle="arc3,rad=0.1",
-    )
+    _draw_edges(ax, graph, pos, edge_widths, arrowsize=25)
     
     # ノードラベル（関数ID + ファイル名）を作成
     labels = {}
@@ -269,28 +337,25 @@ def save_callgraph_with_metadata(
         font_size=7,
         font_weight="bold",
         font_color="black",
+        ax=ax,
     )
     
     # エッジラベルを描画
     if show_weights:
-        edge_labels = {
-            (u, v): f"{d['weight']}"
-            for u, v, d in graph.edges(data=True)
-            if d.get("weight", 0) > 0
-        }
         nx.draw_networkx_edge_labels(
             graph,
             pos,
             edge_labels,
             font_size=7,
             bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.7),
+            ax=ax,
         )
     
     # タイトル
     if title:
-        plt.title(title, fontsize=18, fontweight="bold", pad=20)
+        ax.set_title(title, fontsize=18, fontweight="bold", pad=20)
     else:
-        plt.title(
+        ax.set_title(
             f"コールグラフ（ファイル情報付き）\n{graph.number_of_nodes()} 関数, {graph.number_of_edges()} 依存関係",
             fontsize=18,
             fontweight="bold",
@@ -304,19 +369,20 @@ def save_callgraph_with_metadata(
         mpatches.Patch(color="white", label=f"エッジ太さ: 呼び出し回数"),
         mpatches.Patch(color="white", label=f"ラベル形式: [関数ID]\\n[ファイル名]"),
     ]
-    plt.legend(
+    ax.legend(
         handles=legend_elements,
         loc="upper left",
         framealpha=0.9,
         fontsize=11,
     )
     
-    plt.axis("off")
-    plt.tight_layout()
+    ax.set_axis_off()
+    fig.tight_layout()
     
-    # 保存
-    plt.savefig(output_path, dpi=dpi, bbox_inches="tight", facecolor="white")
-    plt.close()
+    # 保存（この関数で作成した図だけを閉じる）
+    fig.savefig(output_path, dpi=dpi, bbox_inches="tight", facecolor="white")
+    if not reuse_figure:
+        plt.close(fig)
 
 
 def save_subgraph_by_function(
@@ -345,26 +411,16 @@ def save_subgraph_by_function(
     if func_id not in graph.nodes():
         raise ValueError(f"関数ID {func_id} はグラフに存在しません")
     
+    # 前方（呼び出し先）をdepth階層まで幅優先探索
+    successors = nx.single_source_shortest_path_length(graph, func_id, cutoff=depth)
+    
+    # 後方（呼び出し元）を逆向きのビュー上で幅優先探索（グラフはコピーしない）
+    predecessors = nx.single_source_shortest_path_length(
+        graph.reverse(copy=False), func_id, cutoff=depth
+    )
+    
     # サブグラフのノードを収集
-    subgraph_nodes = {func_id}
-    
-    # 前方（呼び出し先）を探索
-    current_level = {func_id}
-    for _ in range(depth):
-        next_level = set()
-        for node in current_level:
-            next_level.update(graph.successors(node))
-        subgraph_nodes.update(next_level)
-        current_level = next_level
-    
-    # 後方（呼び出し元）を探索
-    current_level = {func_id}
-    for _ in range(depth):
-        next_level = set()
-        for node in current_level:
-            next_level.update(graph.predecessors(node))
-        subgraph_nodes.update(next_level)
-        current_level = next_level
+    subgraph_nodes = {func_id} | successors.keys() | predecessors.keys()
     
     # サブグラフを抽出
     subgraph = graph.subgraph(subgraph_nodes).copy()
@@ -1,38 +1,94 @@
+from array import array
 import networkx as nx
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import Any
 
-from ..classes.jelly import FunctionID, JellyObject, location
-from ..classes.trace import SrcPathInfo, DstPathInfo
+from ..classes.jelly import FunctionID, JellyObject
+from ..classes.trace import SrcPathInfo, DstPathInfo, PathStats, TraceIndex
+from ._dfs import enumerate_paths
+from .csr import build_csr
 
+# 一括探索のワーカープロセスが保持するCSRの各配列（_init_path_workerで設定）
+_worker_rows: tuple[list[int], list[int], list[int]] | None = None
 
-def find_root_nodes(graph: nx.DiGraph) -> set[FunctionID]:
+
+def find_root_nodes(graph: nx.DiGraph | TraceIndex) -> set[FunctionID]:
     """
     グラフ内の根ノード（入次数0のノード）を見つける
     
     Args:
-        graph: NetworkXの有向グラフ
+        graph: NetworkXの有向グラフまたはbuild_trace_indexで構築した索引
     
     Returns:
         根ノードのIDのセット
     """
-    return {node for node in graph.nodes() if graph.in_degree(node) == 0}
+    # 索引が渡された場合は検出済みの結果を使う
+    if isinstance(graph, TraceIndex):
+        return set(graph.roots)
+    
+    # ノードごとに次数を問い合わせず、全ノードの次数を一括で取得して判定
+    return {node for node, degree in graph.in_degree() if degree == 0}
 
 
-def find_leaf_nodes(graph: nx.DiGraph) -> set[FunctionID]:
+def find_leaf_nodes(graph: nx.DiGraph | TraceIndex) -> set[FunctionID]:
     """
     グラフ内の葉ノード（出次数0のノード）を見つける
     
     Args:
-        graph: NetworkXの有向グラフ
+        graph: NetworkXの有向グラフまたはbuild_trace_indexで構築した索引
     
     Returns:
         葉ノードのIDのセット
     """
-    return {node for node in graph.nodes() if graph.out_degree(node) == 0}
+    # 索引が渡された場合は検出済みの結果を使う
+    if isinstance(graph, TraceIndex):
+        return set(graph.leaves)
+    
+    # ノードごとに次数を問い合わせず、全ノードの次数を一括で取得して判定
+    return {node for node, degree in graph.out_degree() if degree == 0}
+
+
+def build_trace_index(graph: nx.DiGraph) -> TraceIndex:
+    """
+    経路探索用の索引（根・葉ノード、CSR形式の隣接関係）を構築
+    
+    同じグラフに対して探索を繰り返す場合は、索引を一度だけ構築して
+    search_src・search_dstなどにグラフの代わりに渡す（グラフを変更した場合は作り直すこと）。
+    多重グラフ（nx.MultiDiGraph）には対応していない。
+    
+    Args:
+        graph: NetworkXの有向グラフ（重み付き）
+    
+    Returns:
+        TraceIndexインスタンス
+    """
+    if graph.is_multigraph():
+        raise ValueError("経路探索の索引は多重辺を持たないグラフ（nx.DiGraph）のみ対応しています")
+    
+    node_ids, forward, reverse = build_csr(graph)
+    index = TraceIndex(
+        roots=frozenset(find_root_nodes(graph)),
+        leaves=frozenset(find_leaf_nodes(graph)),
+        node_ids=node_ids,
+        node_index={node: i for i, node in enumerate(node_ids)},
+        forward=forward,
+        reverse=reverse,
+    )
+    
+    return index
+
+
+def _as_trace_index(graph: nx.DiGraph | TraceIndex) -> TraceIndex:
+    """グラフが渡された場合は索引に変換する"""
+    if isinstance(graph, TraceIndex):
+        return graph
+    return build_trace_index(graph)
 
 
 def search_src(
-    graph: nx.DiGraph,
+    graph: nx.DiGraph | TraceIndex,
     jelly_obj: JellyObject,
     target_func_id: FunctionID,
     max_depth: int = 100
@@ -41,7 +97,7 @@ def search_src(
     指定した関数から根ノード（呼び出し元を遡る）までの全経路を探索
     
     Args:
-        graph: NetworkXの有向グラフ（重み付き）
+        graph: NetworkXの有向グラフ（重み付き）またはbuild_trace_indexで構築した索引
         jelly_obj: JellyObjectインスタンス（location情報取得用）
         target_func_id: 開始関数ID
         max_depth: 最大探索深度（循環検出用）
@@ -49,11 +105,14 @@ def search_src(
     Returns:
         全経路の情報リスト（SrcPathInfo）
     """
-    if target_func_id not in graph.nodes():
+    # 隣接関係はNetworkXのアクセサではなく前計算したCSR形式の索引から引く
+    index = _as_trace_index(graph)
+    
+    if target_func_id not in index.node_index:
         raise ValueError(f"関数ID {target_func_id} はグラフに存在しません")
     
-    # 根ノードを検出
-    root_nodes = find_root_nodes(graph)
+    # 根ノード（索引で検出済み）
+    root_nodes = index.roots
     
     # 開始ノードが既に根ノードの場合
     if target_func_id in root_nodes:
@@ -64,81 +123,17 @@ def search_src(
             parents={}
         )]
     
-    # 全経路を格納
-    all_paths: list[SrcPathInfo] = []
-    
-    # 訪問済みの経路を追跡（重複排除用）
-    visited_paths: set[tuple[FunctionID, ...]] = set()
-    
-    def dfs(
-        current_node: FunctionID,
-        current_path: list[FunctionID],
-        current_weight: int,
-        visited_in_path: set[FunctionID],
-        parents_info: dict[FunctionID, location]
-    ) -> None:
-        """
-        深さ優先探索で根ノードまでの経路を探索
-        
-        Args:
-            current_node: 現在のノード
-            current_path: 現在の経路
-            current_weight: 現在の経路の総重み
-            visited_in_path: 現在の経路で訪問済みのノード（循環検出用）
-            parents_info: 親ノードのlocation情報
-        """
-        # 最大深度チェック
-        if len(current_path) > max_depth:
-            return
-        
-        # 根ノードに到達した場合
-        if current_node in root_nodes:
-            path_tuple = tuple(current_path)
-            if path_tuple not in visited_paths:
-                visited_paths.add(path_tuple)
-                all_paths.append(
-                    SrcPathInfo(
-                        path=current_path.copy(),
-                        total_weight=current_weight,
-                        root_node=current_node,
-                        parents=parents_info.copy()
-                    )
-                )
-            return
-        
-        # 前方のノード（呼び出し元）を探索
-        for predecessor in graph.predecessors(current_node):
-            # 循環検出：既に現在の経路で訪問済みの場合はスキップ
-            if predecessor in visited_in_path:
-                continue
-            
-            # エッジの重みを取得
-            edge_weight = graph[predecessor][current_node].get("weight", 1)
-            
-            # 親ノードのlocation情報を取得
-            new_parents_info = parents_info.copy()
-            if predecessor in jelly_obj.functions:
-                new_parents_info[predecessor] = jelly_obj.functions[predecessor]
-            
-            # 次のノードへ進む
-            new_path = current_path + [predecessor]
-            new_weight = current_weight + edge_weight
-            new_visited = visited_in_path | {predecessor}
-            
-            dfs(predecessor, new_path, new_weight, new_visited, new_parents_info)
+    # 経路の列挙は内部IDの整数配列だけで行い、結果の変換はまとめて行う
+    indptr, indices, weights = index.reverse.rows
+    paths_flat, path_offsets, path_weights = enumerate_paths(
+        indptr, indices, weights, index.node_index[target_func_id], max_depth
+    )
     
-    # 探索開始
-    initial_parents = {}
-    if target_func_id in jelly_obj.functions:
-        initial_parents[target_func_id] = jelly_obj.functions[target_func_id]
-    
-    dfs(target_func_id, [target_func_id], 0, {target_func_id}, initial_parents)
-    
-    return all_paths
+    return _to_src_paths(index, jelly_obj, paths_flat, path_offsets, path_weights)
 
 
 def search_dst(
-    graph: nx.DiGraph,
+    graph: nx.DiGraph | TraceIndex,
     jelly_obj: JellyObject,
     target_func_id: FunctionID,
     max_depth: int = 100
@@ -147,7 +142,7 @@ def search_dst(
     指定した関数から葉ノード（呼び出し先を辿る）までの全経路を探索
     
     Args:
-        graph: NetworkXの有向グラフ（重み付き）
+        graph: NetworkXの有向グラフ（重み付き）またはbuild_trace_indexで構築した索引
         jelly_obj: JellyObjectインスタンス（location情報取得用）
         target_func_id: 開始関数ID
         max_depth: 最大探索深度（循環検出用）
@@ -155,11 +150,14 @@ def search_dst(
     Returns:
         全経路の情報リスト（DstPathInfo）
     """
-    if target_func_id not in graph.nodes():
+    # 隣接関係はNetworkXのアクセサではなく前計算したCSR形式の索引から引く
+    index = _as_trace_index(graph)
+    
+    if target_func_id not in index.node_index:
         raise ValueError(f"関数ID {target_func_id} はグラフに存在しません")
     
-    # 葉ノードを検出
-    leaf_nodes = find_leaf_nodes(graph)
+    # 葉ノード（索引で検出済み）
+    leaf_nodes = index.leaves
     
     # 開始ノードが既に葉ノードの場合
     if target_func_id in leaf_nodes:
@@ -172,80 +170,349 @@ def search_dst(
             children=children_info
         )]
     
+    # 経路の列挙は内部IDの整数配列だけで行い、結果の変換はまとめて行う
+    indptr, indices, weights = index.forward.rows
+    paths_flat, path_offsets, path_weights = enumerate_paths(
+        indptr, indices, weights, index.node_index[target_func_id], max_depth
+    )
+    
+    return _to_dst_paths(index, jelly_obj, paths_flat, path_offsets, path_weights)
+
+
+def _to_src_paths(
+    index: TraceIndex,
+    jelly_obj: JellyObject,
+    paths_flat: array,
+    path_offsets: array,
+    path_weights: list[int],
+) -> list[SrcPathInfo]:
+    """enumerate_pathsの結果（内部IDの経路）をSrcPathInfoのリストに変換"""
     # 全経路を格納
-    all_paths: list[DstPathInfo] = []
+    all_paths: list[SrcPathInfo] = []
     
-    # 訪問済みの経路を追跡（重複排除用）
-    visited_paths: set[tuple[FunctionID, ...]] = set()
-    
-    def dfs(
-        current_node: FunctionID,
-        current_path: list[FunctionID],
-        current_weight: int,
-        visited_in_path: set[FunctionID],
-        children_info: dict[FunctionID, location]
-    ) -> None:
-        """
-        深さ優先探索で葉ノードまでの経路を探索
-        
-        Args:
-            current_node: 現在のノード
-            current_path: 現在の経路
-            current_weight: 現在の経路の総重み
-            visited_in_path: 現在の経路で訪問済みのノード（循環検出用）
-            children_info: 子ノードのlocation情報
-        """
-        # 最大深度チェック
-        if len(current_path) > max_depth:
-            return
-        
-        # 葉ノードに到達した場合
-        if current_node in leaf_nodes:
-            path_tuple = tuple(current_path)
-            if path_tuple not in visited_paths:
-                visited_paths.add(path_tuple)
-                all_paths.append(
-                    DstPathInfo(
-                        path=current_path.copy(),
-                        total_weight=current_weight,
-                        children=children_info.copy()
-                    )
-                )
-            return
+    node_ids = index.node_ids
+    
+    # 単純グラフ（build_trace_indexで確認済み）では同じ隣接ノードを2回辿ることはないため、
+    # 列挙された経路は重複しない（経路の重複排除は不要）
+    
+    # 内部IDを関数IDへ一括で変換
+    func_ids_flat = [node_ids[node] for node in paths_flat]
+    functions = jelly_obj.functions
+    
+    for k, total_weight in enumerate(path_weights):
+        path = func_ids_flat[path_offsets[k]:path_offsets[k + 1]]
         
-        # 後方のノード（呼び出し先）を探索
-        for successor in graph.successors(current_node):
-            # 循環検出：既に現在の経路で訪問済みの場合はスキップ
-            if successor in visited_in_path:
-                continue
-            
-            # エッジの重みを取得
-            edge_weight = graph[current_node][successor].get("weight", 1)
-            
-            # 子ノードのlocation情報を取得
-            new_children_info = children_info.copy()
-            if successor in jelly_obj.functions:
-                new_children_info[successor] = jelly_obj.functions[successor]
-            
-            # 次のノードへ進む
-            new_path = current_path + [successor]
-            new_weight = current_weight + edge_weight
-            new_visited = visited_in_path | {successor}
-            
-            dfs(successor, new_path, new_weight, new_visited, new_children_info)
+        all_paths.append(
+            SrcPathInfo(
+                path=path,
+                total_weight=total_weight,
+                root_node=path[-1],
+                # 経路上のノードのlocation情報（経路の順、探索中は保持せず記録時に一度だけ作成）
+                parents={
+                    func_id: loc for func_id in path
+                    if (loc := functions.get(func_id)) is not None
+                }
+            )
+        )
+    
+    return all_paths
+
+
+def _to_dst_paths(
+    index: TraceIndex,
+    jelly_obj: JellyObject,
+    paths_flat: array,
+    path_offsets: array,
+    path_weights: list[int],
+) -> list[DstPathInfo]:
+    """enumerate_pathsの結果（内部IDの経路）をDstPathInfoのリストに変換"""
+    # 全経路を格納
+    all_paths: list[DstPathInfo] = []
+    
+    node_ids = index.node_ids
     
-    # 探索開始
-    initial_children = {}
-    if target_func_id in jelly_obj.functions:
-        initial_children[target_func_id] = jelly_obj.functions[target_func_id]
+    # 単純グラフ（build_trace_indexで確認済み）では同じ隣接ノードを2回辿ることはないため、
+    # 列挙された経路は重複しない（経路の重複排除は不要）
     
-    dfs(target_func_id, [target_func_id], 0, {target_func_id}, initial_children)
+    # 内部IDを関数IDへ一括で変換
+    func_ids_flat = [node_ids[node] for node in paths_flat]
+    functions = jelly_obj.functions
+    
+    for k, total_weight in enumerate(path_weights):
+        path = func_ids_flat[path_offsets[k]:path_offsets[k + 1]]
+        
+        all_paths.append(
+            DstPathInfo(
+                path=path,
+                total_weight=total_weight,
+                # 経路上のノードのlocation情報（経路の順、探索中は保持せず記録時に一度だけ作成）
+                children={
+                    func_id: loc for func_id in path
+                    if (loc := functions.get(func_id)) is not None
+                }
+            )
+        )
     
     return all_paths
 
 
+def _init_path_worker(indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray) -> None:
+    """ワーカープロセスの初期化（CSRの配列を一度だけ受け取り、走査用のリストに変換）"""
+    global _worker_rows
+    _worker_rows = (indptr.tolist(), indices.tolist(), weights.tolist())
+
+
+def _enumerate_paths_in_worker(start: int, max_depth: int) -> tuple[array, array, list[int]]:
+    """ワーカープロセスで1つの開始ノードからの経路を列挙"""
+    return enumerate_paths(*_worker_rows, start, max_depth)
+
+
+def _search_batch(
+    graph: nx.DiGraph | TraceIndex,
+    target_func_ids: list[FunctionID],
+    max_depth: int,
+    max_workers: int | None,
+    reverse: bool,
+) -> tuple[TraceIndex, dict[FunctionID, tuple[list[int], list[int], list[int]]]]:
+    """
+    複数の開始関数からの経路の列挙をプロセスに分散して実行
+    
+    ワーカーにはNetworkXのグラフではなくCSRの配列だけを（各プロセスに一度だけ）渡す。
+    開始ノード自体が終端ノードのものは列挙の対象外（呼び出し側で処理する）。
+    
+    Returns:
+        (索引, 開始関数ID -> enumerate_pathsの結果 の辞書)
+    """
+    index = _as_trace_index(graph)
+    csr = index.reverse if reverse else index.forward
+    terminal_nodes = index.roots if reverse else index.leaves
+    
+    for target_func_id in target_func_ids:
+        if target_func_id not in index.node_index:
+            raise ValueError(f"関数ID {target_func_id} はグラフに存在しません")
+    
+    # 重複を除いた列挙対象（順序は保持）
+    pending = [
+        target_func_id for target_func_id in dict.fromkeys(target_func_ids)
+        if target_func_id not in terminal_nodes
+    ]
+    
+    enumerated: dict[FunctionID, tuple[list[int], list[int], list[int]]] = {}
+    if not pending:
+        return index, enumerated
+    
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_path_worker,
+        initargs=(csr.indptr, csr.indices, csr.weights),
+    ) as executor:
+        starts = [index.node_index[target_func_id] for target_func_id in pending]
+        for target_func_id, result in zip(
+            pending, executor.map(_enumerate_paths_in_worker, starts, repeat(max_depth))
+        ):
+            enumerated[target_func_id] = result
+    
+    return index, enumerated
+
+
+def search_src_batch(
+    graph: nx.DiGraph | TraceIndex,
+    jelly_obj: JellyObject,
+    target_func_ids: list[FunctionID],
+    max_depth: int = 100,
+    max_workers: int | None = None,
+) -> dict[FunctionID, list[SrcPathInfo]]:
+    """
+    複数の関数について、search_srcを複数プロセスで並列に実行
+    
+    Args:
+        graph: NetworkXの有向グラフ（重み付き）またはbuild_trace_indexで構築した索引
+        jelly_obj: JellyObjectインスタンス（location情報取得用、ワーカーには渡さない）
+        target_func_ids: 開始関数IDのリスト
+        max_depth: 最大探索深度（循環検出用）
+        max_workers: ワーカープロセス数（Noneの場合はCPU数）
+    
+    Returns:
+        開始関数ID -> 全経路の情報リスト（search_srcと同じ結果）の辞書（target_func_idsの順）
+    """
+    index, enumerated = _search_batch(graph, target_func_ids, max_depth, max_workers, reverse=True)
+    
+    results: dict[FunctionID, list[SrcPathInfo]] = {}
+    for target_func_id in target_func_ids:
+        if target_func_id in enumerated:
+            results[target_func_id] = _to_src_paths(index, jelly_obj, *enumerated[target_func_id])
+        else:
+            # 開始ノードが根ノードの場合は列挙不要
+            results[target_func_id] = search_src(index, jelly_obj, target_func_id, max_depth)
+    
+    return results
+
+
+def search_dst_batch(
+    graph: nx.DiGraph | TraceIndex,
+    jelly_obj: JellyObject,
+    target_func_ids: list[FunctionID],
+    max_depth: int = 100,
+    max_workers: int | None = None,
+) -> dict[FunctionID, list[DstPathInfo]]:
+    """
+    複数の関数について、search_dstを複数プロセスで並列に実行
+    
+    Args:
+        graph: NetworkXの有向グラフ（重み付き）またはbuild_trace_indexで構築した索引
+        jelly_obj: JellyObjectインスタンス（location情報取得用、ワーカーには渡さない）
+        target_func_ids: 開始関数IDのリスト
+        max_depth: 最大探索深度（循環検出用）
+        max_workers: ワーカープロセス数（Noneの場合はCPU数）
+    
+    Returns:
+        開始関数ID -> 全経路の情報リスト（search_dstと同じ結果）の辞書（target_func_idsの順）
+    """
+    index, enumerated = _search_batch(graph, target_func_ids, max_depth, max_workers, reverse=False)
+    
+    results: dict[FunctionID, list[DstPathInfo]] = {}
+    for target_func_id in target_func_ids:
+        if target_func_id in enumerated:
+            results[target_func_id] = _to_dst_paths(index, jelly_obj, *enumerated[target_func_id])
+        else:
+            # 開始ノードが葉ノードの場合は列挙不要
+            results[target_func_id] = search_dst(index, jelly_obj, target_func_id, max_depth)
+    
+    return results
+
+
+def compute_path_stats_to_roots(
+    graph: nx.DiGraph | TraceIndex,
+    target_func_id: FunctionID,
+    max_depth: int = 100,
+) -> dict[FunctionID, PathStats] | None:
+    """
+    search_srcで得られる経路の集計情報を、経路を列挙せずに根ノードごとに計算
+    
+    開始関数の祖先（呼び出し元を遡って到達できるノード）が循環を含まない場合、
+    祖先を帰りがけ順に処理する動的計画法で O(V+E) で計算できる
+    （ノードごとに「そのノードから各根ノードまでの経路」の統計量を呼び出し元から集約する）。
+    
+    Args:
+        graph: NetworkXの有向グラフ（重み付き）またはbuild_trace_indexで構築した索引
+        target_func_id: 開始関数ID
+        max_depth: 最大探索深度（search_srcと同じ）
+    
+    Returns:
+        根ノードの関数ID -> PathStats の辞書。
+        祖先に循環がある場合、または最長の経路がmax_depthを超える場合
+        （search_srcの結果と一致しない場合）はNone
+    """
+    index = _as_trace_index(graph)
+    
+    if target_func_id not in index.node_index:
+        raise ValueError(f"関数ID {target_func_id} はグラフに存在しません")
+    
+    node_ids = index.node_ids
+    indptr, indices, weights = index.reverse.rows
+    start = index.node_index[target_func_id]
+    
+    # ノードの状態（0: 未訪問, 1: 探索中, 2: 集計済み）
+    state = bytearray(len(indptr) - 1)
+    state[start] = 1
+    
+    # 内部ID -> {根ノードの内部ID: [経路数, 総重みの合計, 最小重み, 最大重み, 経路長の合計, 最短, 最長]}
+    stats: dict[int, dict[int, list[int]]] = {}
+    
+    # 呼び出し元を辿る帰りがけ順の探索（呼び出し元を先に集計してからノード自身を集計する）
+    node_stack: list[int] = [start]
+    next_edge: list[int] = [indptr[start]]
+    while node_stack:
+        node = node_stack[-1]
+        pos = next_edge[-1]
+        
+        if pos < indptr[node + 1]:
+            next_edge[-1] = pos + 1
+            predecessor = indices[pos]
+            
+            # 探索中のノードに戻る場合は循環があるため、動的計画法は使えない
+            if state[predecessor] == 1:
+                return None
+            if state[predecessor] == 0:
+                state[predecessor] = 1
+                node_stack.append(predecessor)
+                next_edge.append(indptr[predecessor])
+            continue
+        
+        node_stack.pop()
+        next_edge.pop()
+        state[node] = 2
+        
+        # 根ノードは自分自身だけの経路を持つ
+        if indptr[node] == indptr[node + 1]:
+            stats[node] = {node: [1, 0, 0, 0, 1, 1, 1]}
+            continue
+        
+        # 呼び出し元の統計量にエッジ (呼び出し元 -> node) を1本加えて根ノードごとに集約
+        merged: dict[int, list[int]] = {}
+        for edge in range(indptr[node], indptr[node + 1]):
+            weight = weights[edge]
+            for root, (count, weight_sum, min_w, max_w, length_sum, min_len, max_len) in (
+                stats[indices[edge]].items()
+            ):
+                current = merged.get(root)
+                if current is None:
+                    merged[root] = [
+                        count,
+                        weight_sum + count * weight,
+                        min_w + weight,
+                        max_w + weight,
+                        length_sum + count,
+                        min_len + 1,
+                        max_len + 1,
+                    ]
+                else:
+                    current[0] += count
+                    current[1] += weight_sum + count * weight
+                    current[2] = min(current[2], min_w + weight)
+                    current[3] = max(current[3], max_w + weight)
+                    current[4] += length_sum + count
+                    current[5] = min(current[5], min_len + 1)
+                    current[6] = max(current[6], max_len + 1)
+        stats[node] = merged
+    
+    # 最大探索深度で打ち切られる経路がある場合は列挙結果と一致しない
+    if any(values[6] > max_depth for values in stats[start].values()):
+        return None
+    
+    return {
+        node_ids[root]: PathStats(
+            count=count,
+            weight_sum=weight_sum,
+            min_weight=min_w,
+            max_weight=max_w,
+            length_sum=length_sum,
+            min_length=min_len,
+            max_length=max_len,
+        )
+        for root, (count, weight_sum, min_w, max_w, length_sum, min_len, max_len) in (
+            stats[start].items()
+        )
+    }
+
+
+def _summarize_paths(paths: list[SrcPathInfo]) -> PathStats:
+    """経路のリストから集計情報を作成"""
+    weights = [p.total_weight for p in paths]
+    lengths = [len(p.path) for p in paths]
+    return PathStats(
+        count=len(paths),
+        weight_sum=sum(weights),
+        min_weight=min(weights),
+        max_weight=max(weights),
+        length_sum=sum(lengths),
+        min_length=min(lengths),
+        max_length=max(lengths),
+    )
+
+
 def print_src_trace_results(
-    graph: nx.DiGraph,
+    graph: nx.DiGraph | TraceIndex,
     jelly_obj: JellyObject,
     target_func_id: FunctionID,
     max_depth: int = 100,
@@ -255,73 +522,104 @@ def print_src_trace_results(
     search_srcの結果を整形して表示
     
     Args:
-        graph: NetworkXの有向グラフ（重み付き）
+        graph: NetworkXの有向グラフ（重み付き）またはbuild_trace_indexで構築した索引
         jelly_obj: JellyObjectインスタンス
         target_func_id: 開始関数ID
         max_depth: 最大探索深度
         show_all_paths: 全経路を表示するか（Falseの場合はサマリのみ）
     """
-    paths = search_src(graph, jelly_obj, target_func_id, max_depth)
+    # 集計と経路の列挙で同じ索引を使う
+    index = _as_trace_index(graph)
     
-    print(f"\n{'='*80}")
-    print(f"関数 {target_func_id} から根ノード（呼び出し元）までの経路探索結果")
-    print(f"{'='*80}\n")
+    # サマリのみの場合は、可能であれば経路を列挙せずに集計情報だけを計算する
+    stats_by_root: dict[FunctionID, PathStats] | None = None
+    if not show_all_paths:
+        stats_by_root = compute_path_stats_to_roots(index, target_func_id, max_depth)
     
-    if not paths:
-        print("⚠️  根ノードへの経路が見つかりませんでした")
-        print("   （循環参照のみ、または到達不可能）\n")
+    paths_by_root: dict[FunctionID, list[SrcPathInfo]] = {}
+    if stats_by_root is None:
+        paths = search_src(index, jelly_obj, target_func_id, max_depth)
+        
+        # 根ノードごとにグループ化
+        for path_info in paths:
+            root = path_info.root_node
+            if root not in paths_by_root:
+                paths_by_root[root] = []
+            paths_by_root[root].append(path_info)
+        
+        stats_by_root = {
+            root: _summarize_paths(root_paths) for root, root_paths in paths_by_root.items()
+        }
+    
+    # 出力は行ごとにprintせず、まとめて1回で書き出す
+    lines: list[str] = []
+    out = lines.append
+    
+    out(f"\n{'='*80}")
+    out(f"関数 {target_func_id} から根ノード（呼び出し元）までの経路探索結果")
+    out(f"{'='*80}\n")
+    
+    if not stats_by_root:
+        out("⚠️  根ノードへの経路が見つかりませんでした")
+        out("   （循環参照のみ、または到達不可能）\n")
+        print("\n".join(lines))
         return
     
-    # 根ノードごとにグループ化
-    paths_by_root: dict[FunctionID, list[SrcPathInfo]] = {}
-    for path_info in paths:
-        root = path_info.root_node
-        if root not in paths_by_root:
-            paths_by_root[root] = []
-        paths_by_root[root].append(path_info)
+    total_count = sum(stats.count for stats in stats_by_root.values())
+    
+    out(f"📊 サマリ:")
+    out(f"  - 発見された経路数: {total_count}")
+    out(f"  - 到達可能な根ノード数: {len(stats_by_root)}")
+    out("")
     
-    print(f"📊 サマリ:")
-    print(f"  - 発見された経路数: {len(paths)}")
-    print(f"  - 到達可能な根ノード数: {len(paths_by_root)}")
-    print()
+    # 関数IDの文字列表現は経路間で共有されるため、関数IDごとに一度だけ作成する
+    node_strs: dict[FunctionID, str] = {}
+    
+    def node_str(node: FunctionID) -> str:
+        text = node_strs.get(node)
+        if text is None:
+            text = node_strs[node] = str(node)
+        return text
     
     # 根ノードごとに表示
-    for root_id, root_paths in sorted(paths_by_root.items()):
-        print(f"🌳 根ノード {root_id} への経路 ({len(root_paths)}件)")
-        print(f"   {'-'*76}")
+    for root_id, stats in sorted(stats_by_root.items()):
+        out(f"🌳 根ノード {root_id} への経路 ({stats.count}件)")
+        out(f"   {'-'*76}")
         
         if show_all_paths:
-            for i, path_info in enumerate(root_paths, 1):
+            for i, path_info in enumerate(paths_by_root[root_id], 1):
                 # 経路を逆順にして表示（根→開始の順）
-                reversed_path = path_info.path[::-1]
-                path_str = " → ".join(str(node) for node in reversed_path)
+                path_str = " → ".join(map(node_str, reversed(path_info.path)))
                 
-                print(f"   [{i}] {path_str}")
-                print(f"       総重み: {path_info.total_weight}, 経路長: {len(path_info.path)}")
-                print(f"       親ノード数: {len(path_info.parents)}")
+                out(f"   [{i}] {path_str}")
+                out(f"       総重み: {path_info.total_weight}, 経路長: {len(path_info.path)}")
+                out(f"       親ノード数: {len(path_info.parents)}")
         else:
             # サマリのみ表示
-            weights = [p.total_weight for p in root_paths]
-            lengths = [len(p.path) for p in root_paths]
-            print(f"   総重み範囲: {min(weights)} 〜 {max(weights)}")
-            print(f"   経路長範囲: {min(lengths)} 〜 {max(lengths)}")
+            out(f"   総重み範囲: {stats.min_weight} 〜 {stats.max_weight}")
+            out(f"   経路長範囲: {stats.min_length} 〜 {stats.max_length}")
         
-        print()
+        out("")
     
     # 全体統計
-    all_weights = [p.total_weight for p in paths]
-    all_lengths = [len(p.path) for p in paths]
-    
-    print(f"📈 全体統計:")
-    print(f"  重み - 最小: {min(all_weights)}, 最大: {max(all_weights)}, "
-          f"平均: {sum(all_weights)/len(all_weights):.2f}")
-    print(f"  経路長 - 最小: {min(all_lengths)}, 最大: {max(all_lengths)}, "
-          f"平均: {sum(all_lengths)/len(all_lengths):.2f}")
-    print()
+    all_stats = stats_by_root.values()
+    weight_sum = sum(stats.weight_sum for stats in all_stats)
+    length_sum = sum(stats.length_sum for stats in all_stats)
+    
+    out(f"📈 全体統計:")
+    out(f"  重み - 最小: {min(stats.min_weight for stats in all_stats)}, "
+        f"最大: {max(stats.max_weight for stats in all_stats)}, "
+        f"平均: {weight_sum/total_count:.2f}")
+    out(f"  経路長 - 最小: {min(stats.min_length for stats in all_stats)}, "
+        f"最大: {max(stats.max_length for stats in all_stats)}, "
+        f"平均: {length_sum/total_count:.2f}")
+    out("")
+    
+    print("\n".join(lines))
 
 
 def print_dst_trace_results(
-    graph: nx.DiGraph,
+    graph: nx.DiGraph | TraceIndex,
     jelly_obj: JellyObject,
     target_func_id: FunctionID,
     max_depth: int = 100,
@@ -331,7 +629,7 @@ def print_dst_trace_results(
     search_dstの結果を整形して表示
     
     Args:
-        graph: NetworkXの有向グラフ（重み付き）
+        graph: NetworkXの有向グラフ（重み付き）またはbuild_trace_indexで構築した索引
         jelly_obj: JellyObjectインスタンス
         target_func_id: 開始関数ID
         max_depth: 最大探索深度
@@ -339,45 +637,60 @@ def print_dst_trace_results(
     """
     paths = search_dst(graph, jelly_obj, target_func_id, max_depth)
     
-    print(f"\n{'='*80}")
-    print(f"関数 {target_func_id} から葉ノード（呼び出し先）までの経路探索結果")
-    print(f"{'='*80}\n")
+    # 出力は行ごとにprintせず、まとめて1回で書き出す
+    lines: list[str] = []
+    out = lines.append
+    
+    out(f"\n{'='*80}")
+    out(f"関数 {target_func_id} から葉ノード（呼び出し先）までの経路探索結果")
+    out(f"{'='*80}\n")
     
     if not paths:
-        print("⚠️  葉ノードへの経路が見つかりませんでした")
-        print("   （循環参照のみ、または到達不可能）\n")
+        out("⚠️  葉ノードへの経路が見つかりませんでした")
+        out("   （循環参照のみ、または到達不可能）\n")
+        print("\n".join(lines))
         return
     
-    print(f"📊 サマリ:")
-    print(f"  - 発見された経路数: {len(paths)}")
-    print()
+    out(f"📊 サマリ:")
+    out(f"  - 発見された経路数: {len(paths)}")
+    out("")
     
     # 経路を表示
     if show_all_paths:
+        # 関数IDの文字列表現は経路間で共有されるため、関数IDごとに一度だけ作成する
+        node_strs: dict[FunctionID, str] = {}
+        
+        def node_str(node: FunctionID) -> str:
+            text = node_strs.get(node)
+            if text is None:
+                text = node_strs[node] = str(node)
+            return text
+        
         for i, path_info in enumerate(paths, 1):
-            path_str = " → ".join(str(node) for node in path_info.path)
+            path_str = " → ".join(map(node_str, path_info.path))
             
-            print(f"🍃 経路 {i}:")
-            print(f"   {path_str}")
-            print(f"   総重み: {path_info.total_weight}, 経路長: {len(path_info.path)}")
-            print(f"   子ノード数: {len(path_info.children)}")
-            print()
+            out(f"🍃 経路 {i}:")
+            out(f"   {path_str}")
+            out(f"   総重み: {path_info.total_weight}, 経路長: {len(path_info.path)}")
+            out(f"   子ノード数: {len(path_info.children)}")
+            out("")
     else:
         # サマリのみ表示
         weights = [p.total_weight for p in paths]
         lengths = [len(p.path) for p in paths]
-        print(f"   総重み範囲: {min(weights)} 〜 {max(weights)}")
-        print(f"   経路長範囲: {min(lengths)} 〜 {max(lengths)}")
-        print()
+        out(f"   総重み範囲: {min(weights)} 〜 {max(weights)}")
+        out(f"   経路長範囲: {min(lengths)} 〜 {max(lengths)}")
+        out("")
     
     # # 全体統計
     # all_weights = [p.total_weight for p in paths]
     # all_lengths = [len(p.path) for p in paths]
     
-    # print(f"📈 全体統計:")
-    # print(f"  重み - 最小: {min(all_weights)}, 最大: {max(all_weights)}, "
-    #       f"平均: {sum(all_weights)/len(all_weights):.2f}")
-    # print(f"  経路長 - 最小: {min(all_lengths)}, 最大: {max(all_lengths)}, "
-    #       f"平均: {sum(all_lengths)/len(all_lengths):.2f}")
-    # print()
-
+    # out(f"📈 全体統計:")
+    # out(f"  重み - 最小: {min(all_weights)}, 最大: {max(all_weights)}, "
+    #     f"平均: {sum(all_weights)/len(all_weights):.2f}")
+    # out(f"  経路長 - 最小: {min(all_lengths)}, 最大: {max(all_lengths)}, "
+    #     f"平均: {sum(all_lengths)/len(all_lengths):.2f}")
+    # out("")
+    
+    print("\n".join(lines))
@@ -1,13 +1,27 @@
 import json
+from pathlib import Path
 
 def json_load(file_path: str) -> dict:
     """Load a JSON file and return its contents as a dictionary.
 
     Args:
-        file_path (str): The path to the JSON file.
+        file_path (str): The path to the JSON file (UTF-8/16/32 encoded).
 
     Returns:
         dict: The contents of the JSON file as a dictionary.
     """
-    with open(file_path, "r") as f:
-        return json.load(f)
\ No newline at end of file
+    # Read the whole file as bytes in one call and let json.loads detect the
+    # UTF encoding, instead of decoding through a text-mode file object.
+    return json.loads(Path(file_path).read_bytes())
+
+
+def normalize_path(file_path: str | Path) -> str:
+    """Normalize a file path into the key used for path matching.
+
+    Args:
+        file_path (str | Path): The file path (absolute or relative).
+
+    Returns:
+        str: The path as a string with leading "/" removed.
+    """
+    return str(file_path).lstrip("/")
@@ -1,6 +1,10 @@
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 from ..classes.jelly import (
     CallID,
     FileID,
@@ -8,12 +12,15 @@ from ..classes.jelly import (
     JellyObject,
     location,
 )
-from ..utils.file_io import json_load
+from ..utils.file_io import json_load, normalize_path
 
+@lru_cache(maxsize=1 << 16)
 def parse_location(location_str: str) -> location:
     """
     位置情報文字列をlocationオブジェクトに変換
     
+    同じ文字列に対しては同じlocationインスタンス（不変）を返す（キャッシュ済み）。
+    
     Args:
         location_str: "fileID:startRow:startColumn:endRow:endColumn"形式の文字列
     
@@ -30,6 +37,58 @@ def parse_location(location_str: str) -> location:
     )
 
 
+def parse_locations(location_strs: list[str]) -> list[location]:
+    """
+    複数の位置情報文字列をまとめてlocationオブジェクトに変換
+    
+    全ての文字列を連結して1回のsplitと1回のint変換で数値化する
+    （文字列ごとにsplitとint()を5回呼び出さない）。
+    同じ文字列は1回だけ変換し、同じlocationインスタンス（不変）を共有する
+    
+    Args:
+        location_strs: "fileID:startRow:startColumn:endRow:endColumn"形式の文字列のリスト
+    
+    Returns:
+        locationオブジェクトのリスト（location_strsと同じ順序）
+    """
+    if not location_strs:
+        return []
+    
+    # 重複を除いた文字列だけを変換する
+    unique_strs = list(dict.fromkeys(location_strs))
+    
+    # 項目数が5でない文字列が含まれる場合は1件ずつ変換する（parse_locationと同じ結果・例外にする）
+    if any(location_str.count(":") != 4 for location_str in unique_strs):
+        unique_locs = [parse_location(location_str) for location_str in unique_strs]
+    else:
+        fields = ":".join(unique_strs).split(":")
+        values = iter(map(int, fields))
+        unique_locs = [location(*row) for row in zip(values, values, values, values, values)]
+    
+    if len(unique_strs) == len(location_strs):
+        return unique_locs
+    
+    # 同じ文字列には同じlocationインスタンスを割り当てる
+    loc_by_str = dict(zip(unique_strs, unique_locs))
+    return [loc_by_str[location_str] for location_str in location_strs]
+
+
+def pairs_to_array(pairs: list[list[int]]) -> np.ndarray:
+    """
+    [[a, b], ...] 形式のJSONの配列を (E, 2) のint32配列に変換
+    
+    入れ子のリストをnp.arrayに渡さず、平坦化したイテレータから一度に確保して埋める
+    
+    Args:
+        pairs: 2要素のリストのリスト（fun2fun・call2fun）
+    
+    Returns:
+        int32, shape (E, 2) の配列
+    """
+    flat = np.fromiter(chain.from_iterable(pairs), dtype=np.int32, count=2 * len(pairs))
+    return flat.reshape(-1, 2)
+
+
 def mapping_jelly(json_data: dict[str, Any]) -> JellyObject:
     """
     Jelly JSONデータをJellyObjectにマッピング
@@ -43,29 +102,32 @@ def mapping_jelly(json_data: dict[str, Any]) -> JellyObject:
     # filesリストをFileID -> ファイルパスの辞書に変換
     files = {FileID(i): filepath for i, filepath in enumerate(json_data["files"])}
     
+    # 照合用に正規化したファイルパスを読み込み時に一度だけ作成
+    files_norm = {file_id: normalize_path(filepath) for file_id, filepath in files.items()}
+    
+    # functionsとcallsの位置情報をまとめて変換
+    # （両方に現れる同じ位置情報文字列は同じlocationインスタンスを共有する）
+    func_loc_strs = list(json_data["functions"].values())
+    call_loc_strs = list(json_data["calls"].values())
+    locs = parse_locations(func_loc_strs + call_loc_strs)
+    
     # functionsをFunctionID -> locationの辞書に変換
-    functions = {
-        FunctionID(int(func_id)): parse_location(loc_str)
-        for func_id, loc_str in json_data["functions"].items()
+    functions: dict[FunctionID, location] = {
+        FunctionID(int(func_id)): loc
+        for func_id, loc in zip(json_data["functions"], locs[:len(func_loc_strs)])
     }
     
     # callsをCallID -> locationの辞書に変換
-    calls = {
-        CallID(int(call_id)): parse_location(loc_str)
-        for call_id, loc_str in json_data["calls"].items()
+    calls: dict[CallID, location] = {
+        CallID(int(call_id)): loc
+        for call_id, loc in zip(json_data["calls"], locs[len(func_loc_strs):])
     }
     
-    # fun2funをリストに変換（各要素を[FunctionID, FunctionID]に）
-    fun2fun = [
-        [FunctionID(src), FunctionID(dst)]
-        for src, dst in json_data["fun2fun"]
-    ]
+    # fun2funを(E, 2)のint32配列に変換（各行が[FunctionID, FunctionID]）
+    fun2fun = pairs_to_array(json_data["fun2fun"])
     
-    # call2funをリストに変換（各要素を[CallID, FunctionID]に）
-    call2fun = [
-        [CallID(call), FunctionID(func)]
-        for call, func in json_data["call2fun"]
-    ]
+    # call2funを(E, 2)のint32配列に変換（各行が[CallID, FunctionID]）
+    call2fun = pairs_to_array(json_data["call2fun"])
     
     return JellyObject(
         files=files,
@@ -73,6 +135,7 @@ def mapping_jelly(json_data: dict[str, Any]) -> JellyObject:
         calls=calls,
         fun2fun=fun2fun,
         call2fun=call2fun,
+        files_norm=files_norm,
     )
 
 
@@ -1,4 +1,24 @@
-from ..classes.jelly import CallID, dependMap, FunctionID, JellyObject, location
+import heapq
+from operator import itemgetter
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ..classes.jelly import (
+    CallID,
+    dependMap,
+    FileID,
+    FunctionColumns,
+    FunctionID,
+    JellyObject,
+    location,
+)
+
+if TYPE_CHECKING:
+    from scipy.sparse import csc_array, csr_array
+
+# find_src_functionsで一度に作成する (呼び出し × 関数) の判定行列の最大要素数
+_MAX_MASK_SIZE = 1 << 20
 
 
 def is_call_in_function(call_loc: location, func_loc: location) -> bool:
@@ -60,6 +80,149 @@ def find_src_function(
     return best_match[0]
 
 
+def _build_function_columns(
+    functions: dict[FunctionID, location] | FunctionColumns,
+) -> dict[FileID, tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    ファイルごとに関数の位置情報を列ごとの配列にまとめる（find_src_functionsの一括処理用）
+    
+    各ファイルの関数は find_src_function の優先順（行数, 列幅, 辞書中の順番）でソートしておく
+    
+    Args:
+        functions: 関数ID -> 位置情報の辞書、またはJellyObject.function_columns
+    
+    Returns:
+        ファイルID -> (開始行の配列, 終了行の配列, 関数IDの配列) の辞書
+    """
+    n_functions = len(functions)
+    if n_functions == 0:
+        return {}
+    if not isinstance(functions, FunctionColumns):
+        functions = FunctionColumns.from_locations(functions)
+    
+    func_ids = functions.func_id.astype(np.int64)
+    fileids = functions.fileid.astype(np.int64)
+    startrows = functions.startrow.astype(np.int64)
+    endrows = functions.endrow.astype(np.int64)
+    colspans = functions.endcolumn.astype(np.int64) - functions.startcolumn
+    
+    # ファイルID, 行数, 列幅, 辞書中の順番 の優先順でソート（lexsortは最後のキーが最優先）
+    order = np.lexsort((np.arange(n_functions), colspans, endrows - startrows, fileids))
+    sorted_fileids = fileids[order]
+    
+    # ファイルIDの境界で分割
+    boundaries = np.flatnonzero(np.diff(sorted_fileids)) + 1
+    block_starts = [0, *boundaries.tolist()]
+    
+    columns: dict[FileID, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+    for block_start, block in zip(block_starts, np.split(order, boundaries)):
+        columns[FileID(int(sorted_fileids[block_start]))] = (
+            startrows[block], endrows[block], func_ids[block]
+        )
+    
+    return columns
+
+
+def find_src_functions(
+    call_fileids: np.ndarray,
+    call_startrows: np.ndarray,
+    call_endrows: np.ndarray,
+    functions: dict[FunctionID, location] | FunctionColumns,
+) -> np.ndarray:
+    """
+    複数の呼び出しを含む関数をまとめて特定（find_src_functionの一括版）
+    
+    結果は呼び出しの (ファイルID, 開始行, 終了行) だけで決まるため、
+    同じ範囲の呼び出しは1回だけ判定する（判定はファイルごとにNumPyで一括して行う）
+    
+    Args:
+        call_fileids: 呼び出しのファイルIDの配列
+        call_startrows: 呼び出しの開始行の配列
+        call_endrows: 呼び出しの終了行の配列
+        functions: 関数ID -> 位置情報の辞書、またはJellyObject.function_columns
+    
+    Returns:
+        呼び出し元の関数IDの配列 int64[N]（見つからない場合は-1）
+    """
+    columns = _build_function_columns(functions)
+    
+    spans = np.stack(
+        [
+            np.asarray(call_fileids, dtype=np.int64),
+            np.asarray(call_startrows, dtype=np.int64),
+            np.asarray(call_endrows, dtype=np.int64),
+        ],
+        axis=1,
+    )
+    unique_spans, inverse = np.unique(spans, axis=0, return_inverse=True)
+    unique_src_ids = np.full(len(unique_spans), -1, dtype=np.int64)
+    
+    # unique_spansはファイルID順に並んでいるため、ファイルごとのブロックに分けて処理
+    span_fileids = unique_spans[:, 0]
+    boundaries = np.flatnonzero(np.diff(span_fileids)) + 1
+    block_starts = [0, *boundaries.tolist()]
+    block_ends = [*boundaries.tolist(), len(unique_spans)]
+    
+    for block_start, block_end in zip(block_starts, block_ends):
+        if block_start == block_end:
+            continue
+        file_columns = columns.get(int(span_fileids[block_start]))
+        if file_columns is None:
+            continue
+        func_startrows, func_endrows, func_ids = file_columns
+        
+        # (呼び出し × 関数) の判定行列が大きくなりすぎないよう、呼び出しを分割して処理
+        step = max(1, _MAX_MASK_SIZE // len(func_ids))
+        for start in range(block_start, block_end, step):
+            stop = min(start + step, block_end)
+            
+            # 呼び出しを完全に含むかを全組み合わせについて分岐なしで一括判定
+            mask = (func_startrows <= unique_spans[start:stop, 1, None]) & (
+                unique_spans[start:stop, 2, None] <= func_endrows
+            )
+            
+            # 関数は優先順にソート済みのため、最初にTrueになる関数が最も範囲の狭い関数
+            first = mask.argmax(axis=1)
+            found = mask[np.arange(stop - start), first]
+            unique_src_ids[start:stop][found] = func_ids[first[found]]
+    
+    return unique_src_ids[inverse.reshape(-1)]
+
+
+def count_dependency_pairs(
+    src_ids: np.ndarray, dst_ids: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (呼び出し元関数ID, 呼び出し先関数ID) のペアごとの出現回数をまとめて数える
+    
+    Args:
+        src_ids: 呼び出し元関数IDの配列
+        dst_ids: 呼び出し先関数IDの配列（src_idsと同じ長さ）
+    
+    Returns:
+        (ペアの配列 int32[N, 2], 出現回数の配列 int64[N]) のタプル
+        ペアは最初に出現した順に並ぶ
+    """
+    # ペアを1つのint64に詰めてからまとめて集計（上位32bit: 呼び出し元, 下位32bit: 呼び出し先）
+    packed = (np.asarray(src_ids, dtype=np.int64) << 32) | (
+        np.asarray(dst_ids, dtype=np.int64) & 0xFFFFFFFF
+    )
+    unique_keys, first_index, counts = np.unique(
+        packed, return_index=True, return_counts=True
+    )
+    
+    # np.uniqueはソート順で返すため、最初に出現した順に並べ直す
+    order = np.argsort(first_index, kind="stable")
+    unique_keys = unique_keys[order]
+    counts = counts[order]
+    
+    pairs = np.stack(
+        [(unique_keys >> 32).astype(np.int32), (unique_keys & 0xFFFFFFFF).astype(np.int32)],
+        axis=1,
+    )
+    return pairs, counts
+
+
 def dependency_weights(jelly_obj: JellyObject) -> dependMap:
     """
     依存関係の重み（呼び出し回数）を計算
@@ -70,31 +233,34 @@ def dependency_weights(jelly_obj: JellyObject) -> dependMap:
     Returns:
         dependMapインスタンス（呼び出し元関数ID, 呼び出し先関数ID -> 呼び出し回数）
     """
-    # 依存関係マップを初期化
-    dependency_counts: dict[tuple[FunctionID, FunctionID], int] = {}
+    call_ids = jelly_obj.call2fun[:, 0]
+    dst_ids = jelly_obj.call2fun[:, 1]
     
-    # call2funの各要素を処理
-    for call_id, dst_func_id in jelly_obj.call2fun:
-        # CallIDから呼び出しの位置情報を取得
-        if call_id not in jelly_obj.calls:
-            continue  # 呼び出し情報が見つからない場合はスキップ
-        
-        call_loc = jelly_obj.calls[call_id]
-        
-        # 呼び出しを含む関数（呼び出し元）を特定
-        src_func_id = find_src_function(call_loc, jelly_obj.functions)
-        
-        if src_func_id is None:
-            continue  # 呼び出し元が見つからない場合はスキップ
-        
-        # 依存関係のキーを作成
-        dependency_key = (src_func_id, dst_func_id)
-        
-        # 呼び出し回数をカウント
-        if dependency_key in dependency_counts:
-            dependency_counts[dependency_key] += 1
-        else:
-            dependency_counts[dependency_key] = 1
+    # 位置情報のある呼び出しだけを残す（見つからない場合はスキップ）
+    calls = jelly_obj.calls
+    has_call = np.fromiter(
+        (call_id in calls for call_id in call_ids.tolist()), dtype=bool, count=len(call_ids)
+    )
+    call_locs = [calls[call_id] for call_id in call_ids[has_call].tolist()]
+    dst_ids = dst_ids[has_call]
+    
+    # 呼び出しの位置情報を列ごとの配列にまとめ、呼び出し元の関数を一括で特定
+    n_calls = len(call_locs)
+    src_ids = find_src_functions(
+        np.fromiter((loc.fileid for loc in call_locs), dtype=np.int64, count=n_calls),
+        np.fromiter((loc.startrow for loc in call_locs), dtype=np.int64, count=n_calls),
+        np.fromiter((loc.endrow for loc in call_locs), dtype=np.int64, count=n_calls),
+        jelly_obj.function_columns,
+    )
+    
+    # 呼び出し元が見つからない呼び出しはスキップ
+    found = src_ids >= 0
+    
+    # 呼び出し回数をペアごとにまとめてカウント
+    pairs, counts = count_dependency_pairs(src_ids[found], dst_ids[found])
+    dependency_counts: dict[tuple[FunctionID, FunctionID], int] = {
+        (src, dst): count for (src, dst), count in zip(pairs.tolist(), counts.tolist())
+    }
     
     return dependMap(dependMap=dependency_counts)
 
@@ -142,6 +308,14 @@ def get_total_calls(depend_map: dependMap) -> int:
     return sum(depend_map.dependMap.values())
 
 
+def _sparse_slice(matrix: "csr_array | csc_array", func_id: FunctionID) -> dict[FunctionID, int]:
+    """CSR行列の行（CSC行列の場合は列）の非ゼロ要素を 関数ID -> 呼び出し回数 の辞書にする"""
+    if not 0 <= func_id < len(matrix.indptr) - 1:
+        return {}
+    start, end = matrix.indptr[func_id], matrix.indptr[func_id + 1]
+    return dict(zip(matrix.indices[start:end].tolist(), matrix.data[start:end].tolist()))
+
+
 def get_caller_dependencies(
     depend_map: dependMap, src_id: FunctionID
 ) -> dict[FunctionID, int]:
@@ -153,13 +327,10 @@ def get_caller_dependencies(
         src_id: 呼び出し元関数ID
     
     Returns:
-        呼び出し先関数ID -> 呼び出し回数の辞書
+        呼び出し先関数ID -> 呼び出し回数の辞書（呼び出し先関数ID順）
     """
-    return {
-        dst: count
-        for (src, dst), count in depend_map.dependMap.items()
-        if src == src_id
-    }
+    # CSR行列から呼び出し元の行だけを取り出す（全ペアの走査は不要）
+    return _sparse_slice(depend_map.caller_matrix, src_id)
 
 
 def get_callee_dependencies(
@@ -173,13 +344,49 @@ def get_callee_dependencies(
         dst_id: 呼び出し先関数ID
     
     Returns:
-        呼び出し元関数ID -> 呼び出し回数の辞書
+        呼び出し元関数ID -> 呼び出し回数の辞書（呼び出し元関数ID順）
     """
-    return {
-        src: count
-        for (src, dst), count in depend_map.dependMap.items()
-        if dst == dst_id
-    }
+    # CSC行列から呼び出し先の列だけを取り出す（全ペアの走査は不要）
+    return _sparse_slice(depend_map.callee_matrix, dst_id)
+
+
+def get_top_caller_dependencies(
+    depend_map: dependMap, src_id: FunctionID, top_n: int = 10
+) -> list[tuple[FunctionID, int]]:
+    """
+    特定の関数が呼び出す関数のうち、呼び出し回数の多い上位N件を取得
+    
+    Args:
+        depend_map: 依存関係マップ
+        src_id: 呼び出し元関数ID
+        top_n: 取得する件数（デフォルト: 10）
+    
+    Returns:
+        (呼び出し先関数ID, 呼び出し回数)のリスト（降順、同じ回数の場合は呼び出し先関数ID順）
+    """
+    # 全件をソートせず、上位N件だけをヒープで取り出す
+    return heapq.nlargest(
+        top_n, get_caller_dependencies(depend_map, src_id).items(), key=itemgetter(1)
+    )
+
+
+def get_top_callee_dependencies(
+    depend_map: dependMap, dst_id: FunctionID, top_n: int = 10
+) -> list[tuple[FunctionID, int]]:
+    """
+    特定の関数を呼び出す関数のうち、呼び出し回数の多い上位N件を取得
+    
+    Args:
+        depend_map: 依存関係マップ
+        dst_id: 呼び出し先関数ID
+        top_n: 取得する件数（デフォルト: 10）
+    
+    Returns:
+        (呼び出し元関数ID, 呼び出し回数)のリスト（降順、同じ回数の場合は呼び出し元関数ID順）
+    """
+    return heapq.nlargest(
+        top_n, get_callee_dependencies(depend_map, dst_id).items(), key=itemgetter(1)
+    )
 
 
 def get_top_dependencies(
@@ -195,9 +402,20 @@ def get_top_dependencies(
     Returns:
         (呼び出し元関数ID, 呼び出し先関数ID, 呼び出し回数)のリスト（降順）
     """
-    sorted_deps = sorted(
-        [(caller, callee, count) for (caller, callee), count in depend_map.dependMap.items()],
-        key=lambda x: x[2],
-        reverse=True,
-    )
-    return sorted_deps[:top_n]
+    dependency_counts = depend_map.dependMap
+    n_pairs = len(dependency_counts)
+    if top_n <= 0 or n_pairs == 0:
+        return []
+    counts = np.fromiter(dependency_counts.values(), dtype=np.int64, count=n_pairs)
+    
+    # 全件をソートせず、argpartitionでN番目に大きい回数を求めてから上位候補だけをソート
+    if top_n < n_pairs:
+        threshold = counts[np.argpartition(counts, n_pairs - top_n)[n_pairs - top_n]]
+        candidates = np.flatnonzero(counts >= threshold)
+    else:
+        candidates = np.arange(n_pairs)
+    
+    # 同じ回数の場合は辞書中の順番を保つ（sorted(..., reverse=True)[:top_n]と同じ順序）
+    top = candidates[np.argsort(-counts[candidates], kind="stable")][:top_n]
+    pairs = list(dependency_counts)
+    return [(*pairs[i], count) for i, count in zip(top.tolist(), counts[top].tolist())]
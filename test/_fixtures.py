@@ -0,0 +1,74 @@
+"""テストスクリプト共通のデータ読み込み（pickleによるキャッシュ付き）"""
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+import jelly_graph
+from jelly_graph.classes.jelly import dependMap, JellyObject
+from jelly_graph.weight.mapping import load_jelly
+from jelly_graph.weight.weight import dependency_weights
+
+# 読み込み・重み計算の処理が変わった場合もキャッシュを作り直すため、キーに含めるソース
+_SOURCE_FILES = (
+    Path(jelly_graph.__file__).parent / "classes" / "jelly.py",
+    Path(jelly_graph.__file__).parent / "weight" / "mapping.py",
+    Path(jelly_graph.__file__).parent / "weight" / "weight.py",
+    Path(jelly_graph.__file__).parent / "utils" / "file_io.py",
+)
+
+
+def _cache_prefix(path: Path) -> str:
+    """入力ファイルごとのキャッシュファイル名の接頭辞"""
+    return hashlib.sha256(str(path).encode()).hexdigest()[:16]
+
+
+def _cache_path(path: Path, cache_dir: Path) -> Path:
+    """(ファイルパス, 更新時刻, サイズ) をキーにしたキャッシュファイルのパス"""
+    key_parts = []
+    for file_path in (path, *_SOURCE_FILES):
+        stat = os.stat(file_path)
+        key_parts.append(f"{file_path}:{stat.st_mtime_ns}:{stat.st_size}")
+    digest = hashlib.sha256("\n".join(key_parts).encode()).hexdigest()
+    return cache_dir / f"{_cache_prefix(path)}-{digest}.pkl"
+
+
+def cached_load(path: str | Path, cache_dir: Path) -> tuple[JellyObject, dependMap]:
+    """
+    jellyの結果ファイルを読み込み、依存関係の重みを計算する（結果はキャッシュする）
+    
+    2回目以降はJSONの解析と重み計算を行わず、pickleしたキャッシュから読み込む
+    （ファイルの更新時刻・サイズが変わった場合は作り直し、古いキャッシュは削除する）。
+    グラフ・経路探索・描画など、読み込み結果を使う側のテスト用で、
+    読み込み・重み計算自体のテスト（test_mapping・test_dependency_weights）は使わないこと。
+    
+    Args:
+        path: jellyの結果JSONファイルのパス
+        cache_dir: キャッシュの保存先ディレクトリ
+    
+    Returns:
+        (JellyObject, dependMap)
+    """
+    path = Path(path).resolve()
+    cache_file = _cache_path(path, cache_dir)
+    
+    if cache_file.exists():
+        with cache_file.open("rb") as f:
+            return pickle.load(f)
+    
+    jelly_obj = load_jelly(path)
+    depend_map = dependency_weights(jelly_obj)
+    
+    # 書き込み途中のファイルを読まないよう、一時ファイルに書いてから置き換える
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with tmp_file.open("wb") as f:
+        pickle.dump((jelly_obj, depend_map), f, protocol=5)
+    tmp_file.replace(cache_file)
+    
+    # 同じ入力ファイルに対する古いキャッシュを削除
+    for old_file in cache_dir.glob(f"{_cache_prefix(path)}-*.pkl"):
+        if old_file != cache_file:
+            old_file.unlink(missing_ok=True)
+    
+    return jelly_obj, depend_map
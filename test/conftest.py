@@ -0,0 +1,45 @@
+"""テスト共通のフィクスチャ"""
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from _fixtures import cached_load
+from jelly_graph.graph.build_callgraph import build_callgraph
+
+# サンプルデータのディレクトリ
+SAMPLE_DIR = Path(__file__).parents[1] / "sample"
+
+
+@pytest.fixture(scope="session")
+def sample_dir() -> Path:
+    """サンプルデータのディレクトリ（存在しない場合はテストをスキップ）"""
+    if not SAMPLE_DIR.is_dir():
+        pytest.skip(f"サンプルデータがありません: {SAMPLE_DIR}")
+    return SAMPLE_DIR
+
+
+@pytest.fixture(scope="session")
+def cache_dir(request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """読み込み結果のキャッシュの保存先（pytestのキャッシュディレクトリ、無効な場合は一時ディレクトリ）"""
+    cache = getattr(request.config, "cache", None)
+    if cache is None:
+        return tmp_path_factory.mktemp("jelly_graph")
+    return cache.mkdir("jelly_graph")
+
+
+@pytest.fixture(scope="session")
+def jelly(sample_dir: Path, cache_dir: Path) -> SimpleNamespace:
+    """
+    サンプルのjelly結果から作成したデータ（テスト全体で一度だけ作成して共有する）
+    
+    キャッシュから読み込むため、読み込み・重み計算の処理自体はこのフィクスチャでは検証されない
+
+    Returns:
+        SimpleNamespace
+        - obj: JellyObject
+        - dm: dependMap
+        - graph: build_callgraphで構築したコールグラフ
+    """
+    obj, dm = cached_load(sample_dir / "jelly_result_single.json", cache_dir)
+    return SimpleNamespace(obj=obj, dm=dm, graph=build_callgraph(dm))
@@ -5,116 +5,142 @@ from pathlib import Path
 # srcディレクトリをパスに追加
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from jelly_graph.weight.mapping import load_jelly
-from jelly_graph.weight.weight import dependency_weights
+import networkx as nx
+
 from jelly_graph.graph.build_callgraph import (
-    build_callgraph,
     build_meta_callgraph,
-    get_graph_statistics,
     get_node_statistics,
-    get_most_called_functions,
-    get_most_calling_functions,
-    get_heaviest_edges,
-    find_cycles,
+    get_all_node_statistics,
+    filter_graph_by_file,
     calculate_pagerank,
-    get_strongly_connected_components,
 )
 from jelly_graph.classes.jelly import FunctionID
 
-# サンプルJSONファイルを読み込み
-sample_file = Path(__file__).parents[1] / "sample" / "jelly_result_single.json"
-jelly_obj = load_jelly(sample_file)
-
-print("=== Jelly データ読み込み完了 ===")
-print(f"ファイル数: {len(jelly_obj.files)}")
-print(f"関数数: {len(jelly_obj.functions)}")
-
-# 依存関係の重みを計算
-print("\n=== 依存関係の重み計算中... ===")
-depend_map = dependency_weights(jelly_obj)
-
-# グラフを構築
-print("\n=== コールグラフ構築中... ===")
-graph = build_callgraph(depend_map)
-graph_with_meta = build_meta_callgraph(depend_map, jelly_obj)
-
-# グラフの統計情報
-print("\n=== グラフ統計情報 ===")
-stats = get_graph_statistics(graph)
-print(f"ノード数（関数数）: {stats['num_nodes']}")
-print(f"エッジ数（依存関係数）: {stats['num_edges']}")
-print(f"総呼び出し回数: {stats['total_weight']}")
-print(f"平均呼び出し回数: {stats['average_weight']:.2f}")
-print(f"グラフ密度: {stats['density']:.4f}")
-print(f"DAG（非循環）: {stats['is_dag']}")
-print(f"強連結成分数: {stats['num_strongly_connected_components']}")
-print(f"弱連結成分数: {stats['num_weakly_connected_components']}")
-
-# 最も重いエッジ（頻繁な呼び出し）
-print("\n=== 最も頻繁な呼び出し Top 5 ===")
-heaviest = get_heaviest_edges(graph, top_n=5)
-for i, (src, dst, weight) in enumerate(heaviest, 1):
-    src_loc = jelly_obj.functions.get(src)
-    dst_loc = jelly_obj.functions.get(dst)
-    src_file = jelly_obj.files.get(src_loc.fileid) if src_loc else "不明"
-    dst_file = jelly_obj.files.get(dst_loc.fileid) if dst_loc else "不明"
-    
-    print(f"{i}. 関数 {src} -> 関数 {dst}: {weight}回")
-    print(f"   {Path(src_file).name if src_file != '不明' else src_file}")
-
-# 最も呼ばれている関数
-print("\n=== 最も呼ばれている関数 Top 5 ===")
-most_called = get_most_called_functions(graph, top_n=5)
-for i, (func_id, count) in enumerate(most_called, 1):
-    loc = jelly_obj.functions.get(func_id)
-    file_path = jelly_obj.files.get(loc.fileid) if loc else "不明"
-    print(f"{i}. 関数 {func_id}: {count}回呼ばれる ({Path(file_path).name if file_path != '不明' else file_path})")
 
-# 最も呼び出している関数
-print("\n=== 最も呼び出している関数 Top 5 ===")
-most_calling = get_most_calling_functions(graph, top_n=5)
-for i, (func_id, count) in enumerate(most_calling, 1):
-    loc = jelly_obj.functions.get(func_id)
-    file_path = jelly_obj.files.get(loc.fileid) if loc else "不明"
-    print(f"{i}. 関数 {func_id}: {count}回呼び出す ({Path(file_path).name if file_path != '不明' else file_path})")
-
-# 特定のノードの統計情報
-test_func_id = FunctionID(14)
-print(f"\n=== 関数 {test_func_id} の詳細情報 ===")
-node_stats = get_node_statistics(graph, test_func_id)
-print(f"呼び出す関数の数（out-degree）: {node_stats['out_degree']}")
-print(f"呼び出される関数の数（in-degree）: {node_stats['in_degree']}")
-print(f"総呼び出し回数（weighted out-degree）: {node_stats['weighted_out_degree']}")
-print(f"総呼ばれた回数（weighted in-degree）: {node_stats['weighted_in_degree']}")
-
-# サイクル検出
-print("\n=== サイクル（循環参照）検出 ===")
-cycles = find_cycles(graph)
-if cycles:
-    print(f"検出されたサイクル数: {len(cycles)}")
-    for i, cycle in enumerate(cycles[:3], 1):  # 最初の3つだけ表示
-        print(f"サイクル {i}: {' -> '.join(map(str, cycle))} -> {cycle[0]}")
-else:
-    print("サイクルは検出されませんでした")
-
-# PageRank計算
-print("\n=== PageRank（重要度）Top 5 ===")
-pagerank = calculate_pagerank(graph)
-top_pagerank = sorted(pagerank.items(), key=lambda x: x[1], reverse=True)[:5]
-for i, (func_id, score) in enumerate(top_pagerank, 1):
-    loc = jelly_obj.functions.get(func_id)
-    file_path = jelly_obj.files.get(loc.fileid) if loc else "不明"
-    print(f"{i}. 関数 {func_id}: {score:.4f} ({Path(file_path).name if file_path != '不明' else file_path})")
-
-# 強連結成分
-print("\n=== 強連結成分 ===")
-sccs = get_strongly_connected_components(graph)
-large_sccs = [scc for scc in sccs if len(scc) > 1]
-if large_sccs:
-    print(f"サイズ > 1 の強連結成分数: {len(large_sccs)}")
-    for i, scc in enumerate(large_sccs[:3], 1):
-        print(f"成分 {i} (サイズ {len(scc)}): {sorted(scc)}")
-else:
-    print("サイズ > 1 の強連結成分はありません（すべての関数が独立）")
-
-print("\n✅ コールグラフ構築・分析完了！")
+def test_callgraph(jelly):
+    # サンプルデータ（conftest.pyのフィクスチャで一度だけ読み込み済み）
+    jelly_obj = jelly.obj
+    depend_map = jelly.dm
+    graph = jelly.graph
+    
+    print("=== Jelly データ読み込み完了 ===")
+    print(f"ファイル数: {len(jelly_obj.files)}")
+    print(f"関数数: {len(jelly_obj.functions)}")
+    
+    # グラフを構築
+    print("\n=== コールグラフ構築中... ===")
+    graph_with_meta = build_meta_callgraph(depend_map, jelly_obj)
+    
+    # グラフの統計情報
+    print("\n=== グラフ統計情報 ===")
+    num_nodes = graph.number_of_nodes()
+    num_edges = graph.number_of_edges()
+    total_weight = graph.size(weight="weight")
+    print(f"ノード数（関数数）: {num_nodes}")
+    print(f"エッジ数（依存関係数）: {num_edges}")
+    print(f"総呼び出し回数: {total_weight}")
+    print(f"平均呼び出し回数: {total_weight / num_edges:.2f}")
+    print(f"グラフ密度: {nx.density(graph):.4f}")
+    print(f"DAG（非循環）: {nx.is_directed_acyclic_graph(graph)}")
+    
+    # エッジは依存関係マップのペアと1対1に対応し、重みは呼び出し回数
+    assert num_edges == len(depend_map.dependMap)
+    assert {(src, dst): w for src, dst, w in graph.edges(data="weight")} == depend_map.dependMap
+    assert num_nodes == len({func_id for pair in depend_map.dependMap for func_id in pair})
+    assert graph_with_meta.number_of_nodes() == num_nodes
+    assert graph_with_meta.number_of_edges() == num_edges
+    
+    # 構築済みのグラフから作っても、ノード・エッジとその属性・並び順は同じ
+    graph_from_base = build_meta_callgraph(depend_map, jelly_obj, base=graph)
+    assert list(graph_from_base.nodes(data=True)) == list(graph_with_meta.nodes(data=True))
+    assert list(graph_from_base.edges(data=True)) == list(graph_with_meta.edges(data=True))
+    # baseのグラフは変更されない
+    assert all(not attrs for _, attrs in graph.nodes(data=True))
+    
+    # 最も重いエッジ（頻繁な呼び出し）
+    print("\n=== 最も頻繁な呼び出し Top 5 ===")
+    heaviest = sorted(graph.edges(data="weight"), key=lambda x: x[2], reverse=True)[:5]
+    for i, (src, dst, weight) in enumerate(heaviest, 1):
+        src_loc = jelly_obj.functions.get(src)
+        src_file = jelly_obj.files.get(src_loc.fileid) if src_loc else "不明"
+        
+        print(f"{i}. 関数 {src} -> 関数 {dst}: {weight}回")
+        print(f"   {Path(src_file).name if src_file != '不明' else src_file}")
+    
+    # メタデータ付きグラフのノード属性
+    print("\n=== メタデータ付きグラフのノード属性 ===")
+    for func_id, attrs in graph_with_meta.nodes(data=True):
+        loc = jelly_obj.functions.get(func_id)
+        if loc is None:
+            assert attrs == {}
+            continue
+        assert attrs["file"] == jelly_obj.files[loc.fileid]
+        assert attrs["lines"] == loc.endrow - loc.startrow + 1
+    print("✅ ファイル名・行範囲が関数の位置情報と一致")
+    
+    # ファイルによる絞り込み
+    first_file = next(iter(jelly_obj.files.values()))
+    print(f"\n=== ファイルによる絞り込み: {Path(first_file).name} ===")
+    file_graph = filter_graph_by_file(graph_with_meta, first_file)
+    print(f"ノード数: {file_graph.number_of_nodes()}, エッジ数: {file_graph.number_of_edges()}")
+    assert set(file_graph) == {
+        func_id for func_id, file_path in graph_with_meta.nodes(data="file", default="")
+        if first_file in file_path
+    }
+    
+    # 構築後に追加したノードも絞り込みの対象になる
+    edited_graph = graph_with_meta.copy()
+    new_func_id = FunctionID(max(edited_graph) + 1)
+    edited_graph.add_node(new_func_id, file=first_file)
+    assert new_func_id in filter_graph_by_file(edited_graph, first_file)
+    
+    # 特定のノードの統計情報
+    test_func_id = FunctionID(14)
+    print(f"\n=== 関数 {test_func_id} の詳細情報 ===")
+    node_stats = get_node_statistics(graph, test_func_id)
+    print(f"呼び出す関数の数（out-degree）: {node_stats['out_degree']}")
+    print(f"呼び出される関数の数（in-degree）: {node_stats['in_degree']}")
+    print(f"総呼び出し回数（weighted out-degree）: {node_stats['weighted_out_degree']}")
+    print(f"総呼ばれた回数（weighted in-degree）: {node_stats['weighted_in_degree']}")
+    
+    # 全ノードの統計情報は個別に取得した場合と一致する
+    all_node_stats = get_all_node_statistics(graph)
+    assert all_node_stats[test_func_id] == node_stats
+    assert all(
+        all_node_stats[func_id] == get_node_statistics(graph, func_id) for func_id in graph
+    )
+    
+    # サイクル検出
+    print("\n=== サイクル（循環参照）検出 ===")
+    cycles = list(nx.simple_cycles(graph))
+    if cycles:
+        print(f"検出されたサイクル数: {len(cycles)}")
+        for i, cycle in enumerate(cycles[:3], 1):  # 最初の3つだけ表示
+            print(f"サイクル {i}: {' -> '.join(map(str, cycle))} -> {cycle[0]}")
+    else:
+        print("サイクルは検出されませんでした")
+    
+    # PageRank計算
+    print("\n=== PageRank（重要度）Top 5 ===")
+    pagerank = calculate_pagerank(graph)
+    top_pagerank = sorted(pagerank.items(), key=lambda x: x[1], reverse=True)[:5]
+    for i, (func_id, score) in enumerate(top_pagerank, 1):
+        loc = jelly_obj.functions.get(func_id)
+        file_path = jelly_obj.files.get(loc.fileid) if loc else "不明"
+        print(f"{i}. 関数 {func_id}: {score:.4f} ({Path(file_path).name if file_path != '不明' else file_path})")
+    
+    assert set(pagerank) == set(graph)
+    assert abs(sum(pagerank.values()) - 1.0) < 1e-6
+    
+    # 強連結成分
+    print("\n=== 強連結成分 ===")
+    sccs = list(nx.strongly_connected_components(graph))
+    large_sccs = [scc for scc in sccs if len(scc) > 1]
+    if large_sccs:
+        print(f"サイズ > 1 の強連結成分数: {len(large_sccs)}")
+        for i, scc in enumerate(large_sccs[:3], 1):
+            print(f"成分 {i} (サイズ {len(scc)}): {sorted(scc)}")
+    else:
+        print("サイズ > 1 の強連結成分はありません（すべての関数が独立）")
+    
+    print("\n✅ コールグラフ構築・分析完了！")
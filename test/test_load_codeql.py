@@ -5,13 +5,14 @@ load_codeql_csv関数のテスト
 from jelly_graph.find.ql_function import load_codeql
 
 
-def main():
+def test_load_codeql(sample_dir):
     print("=== load_codeql_csv テスト ===\n")
     
     # CSVファイルの読み込み
-    codeql_result = load_codeql("sample/ql_result.csv")
+    codeql_result = load_codeql(sample_dir / "ql_result.csv")
     
     print(f"読み込んだ関数の数: {len(codeql_result.function)}\n")
+    assert codeql_result.function
     
     # 最初の5件を表示
     print("--- 最初の5件 ---")
@@ -29,7 +30,7 @@ def main():
     sorted_files = sorted(file_count.items(), key=lambda x: x[1], reverse=True)
     for filepath, count in sorted_files[:5]:
         # ファイル名のみ表示（パスが長いため）
-        filename = filepath.split("/")[-1]
+        filename = filepath.rpartition("/")[2]
         print(f"  {filename}: {count}件")
     
     print(f"\n合計: {len(file_count)}ファイル, {len(codeql_result.function)}関数")
@@ -43,8 +44,7 @@ def main():
         print(f"行範囲型: {type(first_item[1])}")
         print(f"開始行型: {type(first_item[1][0])}")
         print(f"終了行型: {type(first_item[1][1])}")
+        assert isinstance(first_item[0], str)
+        assert isinstance(first_item[1][0], int)
+        assert isinstance(first_item[1][1], int)
         print("✅ 期待通りの型: tuple[str, tuple[int, int]]")
-
-
-if __name__ == "__main__":
-    main()
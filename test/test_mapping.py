@@ -5,37 +5,72 @@ from pathlib import Path
 # srcディレクトリをパスに追加
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from jelly_graph.weight.mapping import load_jelly
+import pytest
 
-# サンプルJSONファイルを読み込んでテスト
-sample_file = Path(__file__).parents[1] / "sample" / "jelly_result_single.json"
-jelly_obj = load_jelly(sample_file)
+from jelly_graph.weight.mapping import load_jelly, parse_location, parse_locations
 
-print("=== JellyObject の内容 ===\n")
-print(f"ファイル数: {len(jelly_obj.files)}")
-print(f"関数数: {len(jelly_obj.functions)}")
-print(f"呼び出し数: {len(jelly_obj.calls)}")
-print(f"fun2fun エッジ数: {len(jelly_obj.fun2fun)}")
-print(f"call2fun エッジ数: {len(jelly_obj.call2fun)}")
 
-print("\n=== ファイル一覧 ===")
-for file_id, filepath in sorted(jelly_obj.files.items()):
-    print(f"FileID {file_id}: {filepath}")
+def test_mapping(jelly, sample_dir):
+    # 読み込み処理自体のテストのため、キャッシュを使わずにJSONから読み込む
+    jelly_obj = load_jelly(sample_dir / "jelly_result_single.json")
+    
+    print("=== JellyObject の内容 ===\n")
+    print(f"ファイル数: {len(jelly_obj.files)}")
+    print(f"関数数: {len(jelly_obj.functions)}")
+    print(f"呼び出し数: {len(jelly_obj.calls)}")
+    print(f"fun2fun エッジ数: {len(jelly_obj.fun2fun)}")
+    print(f"call2fun エッジ数: {len(jelly_obj.call2fun)}")
+    
+    print("\n=== ファイル一覧 ===")
+    for file_id, filepath in sorted(jelly_obj.files.items()):
+        print(f"FileID {file_id}: {filepath}")
+    
+    print("\n=== 最初の5つの関数 ===")
+    for func_id, loc in list(jelly_obj.functions.items())[:5]:
+        print(f"FunctionID {func_id}: File={loc.fileid}, Line={loc.startrow}-{loc.endrow}")
+    
+    print("\n=== 最初の5つの呼び出し ===")
+    for call_id, loc in list(jelly_obj.calls.items())[:5]:
+        print(f"CallID {call_id}: File={loc.fileid}, Line={loc.startrow}-{loc.endrow}")
+    
+    print("\n=== 最初の5つのfun2funエッジ ===")
+    for edge in jelly_obj.fun2fun[:5].tolist():
+        print(f"Function {edge[0]} -> Function {edge[1]}")
+    
+    print("\n=== 最初の5つのcall2funエッジ ===")
+    for edge in jelly_obj.call2fun[:5].tolist():
+        print(f"Call {edge[0]} -> Function {edge[1]}")
+    
+    # 読み込んだデータの整合性を確認
+    assert jelly_obj.functions
+    assert all(loc.fileid in jelly_obj.files for loc in jelly_obj.functions.values())
+    assert all(loc.fileid in jelly_obj.files for loc in jelly_obj.calls.values())
+    assert all(loc.startrow <= loc.endrow for loc in jelly_obj.functions.values())
+    assert jelly_obj.fun2fun.shape == (len(jelly_obj.fun2fun), 2)
+    assert jelly_obj.call2fun.shape == (len(jelly_obj.call2fun), 2)
+    assert all(call_id in jelly_obj.calls for call_id in jelly_obj.call2fun[:, 0].tolist())
+    assert all(func_id in jelly_obj.functions for func_id in jelly_obj.call2fun[:, 1].tolist())
+    
+    # 他のテストが使うフィクスチャ（キャッシュから読み込んだもの）と一致する
+    assert jelly_obj == jelly.obj
+    
+    print("\n✅ マッピング成功！")
 
-print("\n=== 最初の5つの関数 ===")
-for func_id, loc in list(jelly_obj.functions.items())[:5]:
-    print(f"FunctionID {func_id}: File={loc.fileid}, Line={loc.startrow}-{loc.endrow}")
 
-print("\n=== 最初の5つの呼び出し ===")
-for call_id, loc in list(jelly_obj.calls.items())[:5]:
-    print(f"CallID {call_id}: File={loc.fileid}, Line={loc.startrow}-{loc.endrow}")
-
-print("\n=== 最初の5つのfun2funエッジ ===")
-for edge in jelly_obj.fun2fun[:5]:
-    print(f"Function {edge[0]} -> Function {edge[1]}")
-
-print("\n=== 最初の5つのcall2funエッジ ===")
-for edge in jelly_obj.call2fun[:5]:
-    print(f"Call {edge[0]} -> Function {edge[1]}")
-
-print("\n✅ マッピング成功！")
+def test_parse_locations():
+    location_strs = ["0:1:2:3:4", "1:10:1:20:5", "0:1:2:3:4", "2:7:3:7:9"]
+    
+    print("=== parse_locations テスト ===")
+    locs = parse_locations(location_strs)
+    
+    # 1件ずつ変換した結果と一致し、同じ文字列は同じインスタンスを共有する
+    assert locs == [parse_location(location_str) for location_str in location_strs]
+    assert locs[0] is locs[2]
+    assert parse_locations([]) == []
+    # locationは__slots__のみで属性を持つ（インスタンスごとの__dict__を持たない）
+    assert not hasattr(locs[0], "__dict__")
+    
+    # 項目数が不正な文字列はparse_locationと同じ例外になる
+    with pytest.raises(IndexError):
+        parse_locations(["0:1:2:3:4", "0:1:2:3"])
+    print("✅ parse_location と一致")
@@ -2,26 +2,30 @@
 CSVファイルとJellyObjectの紐付けテスト
 """
 
-from pathlib import Path
-from jelly_graph.weight.mapping import load_jelly
+import os
+from jelly_graph.classes.codeql import CodeQLFunction
+from jelly_graph.find.ql_function import iter_codeql_rows, load_codeql, parse_ql_csv
 from jelly_graph.find.match_codeql import (
+    match_codeql_to_jelly,
+    iter_load_and_match_codeql,
     load_and_match_codeql,
     get_matched_function_ids,
     get_unmatched_functions,
 )
 
 
-def main():
+def test_match_codeql(jelly, sample_dir):
     print("=== CodeQL結果とJellyObjectの紐付けテスト ===\n")
     
-    # データの読み込み
-    jelly_obj = load_jelly("sample/jelly_result_single.json")
+    # データの読み込み（JellyObjectはconftest.pyのフィクスチャで一度だけ読み込み済み）
+    jelly_obj = jelly.obj
+    ql_csv = sample_dir / "ql_result.csv"
     
     print(f"JellyObject: {len(jelly_obj.files)}ファイル, {len(jelly_obj.functions)}関数\n")
     
     # base_pathの設定（CSVのパスがjelly_result_single.jsonのファイルパスと合うように）
     # jelly_result_single.jsonのファイルパスの例を確認
-    first_file = list(jelly_obj.files.values())[0]
+    first_file = next(iter(jelly_obj.files.values()))
     print(f"JellyObjectの最初のファイルパス: {first_file}")
     
     # パスの構造から基準パスを推測
@@ -30,53 +34,118 @@ def main():
     # base_pathは不要（もしくはプロジェクトルート）
     
     print("\n--- テスト1: すべての紐付け結果を取得 ---")
-    results = load_and_match_codeql("sample/ql_result.csv", jelly_obj)
-    
-    matched_count = sum(1 for _, _, func_id in results if func_id is not None)
-    unmatched_count = sum(1 for _, _, func_id in results if func_id is None)
+    # 結果はリストにせず、1回の走査で集計・表示・検証と、マッチ・未マッチへの振り分けを行う
+    total_count = 0
+    matched_ids = []
+    unmatched = []
+    first_matched = None
+    for i, (filepath, (start_row, end_row), func_id) in enumerate(
+        iter_load_and_match_codeql(ql_csv, jelly_obj), 1
+    ):
+        total_count += 1
+        filename = filepath.rpartition("/")[2]
+        if func_id is not None:
+            matched_ids.append(func_id)
+            # マッチした関数は行範囲が一致している
+            loc = jelly_obj.functions[func_id]
+            assert (loc.startrow, loc.endrow) == (start_row, end_row)
+            if first_matched is None:
+                first_matched = (filepath, (start_row, end_row), func_id)
+            status = f"✅ FunctionID {func_id}"
+        else:
+            unmatched.append((filepath, (start_row, end_row)))
+            status = "❌ 未マッチ"
+        print(f"{i}. {filename} (行 {start_row}-{end_row}): {status}")
     
-    print(f"総数: {len(results)}件")
+    matched_count = len(matched_ids)
+    unmatched_count = len(unmatched)
+    print(f"\n総数: {total_count}件")
     print(f"マッチ: {matched_count}件")
-    print(f"未マッチ: {unmatched_count}件\n")
+    print(f"未マッチ: {unmatched_count}件")
     
-    for i, (filepath, (start_row, end_row), func_id) in enumerate(results, 1):
-        filename = filepath.split("/")[-1]
-        status = f"✅ FunctionID {func_id}" if func_id is not None else "❌ 未マッチ"
-        print(f"{i}. {filename} (行 {start_row}-{end_row}): {status}")
+    assert matched_count > 0
+    assert matched_count + unmatched_count == total_count
     
     print("\n--- テスト2: マッチした関数IDのみを取得 ---")
-    matched_ids = get_matched_function_ids("sample/ql_result.csv", jelly_obj)
     print(f"マッチした関数ID数: {len(matched_ids)}")
     if matched_ids:
         print(f": {matched_ids}")
     
     print("\n--- テスト3: 未マッチの関数情報を取得 ---")
-    unmatched = get_unmatched_functions("sample/ql_result.csv", jelly_obj)
     print(f"未マッチの関数数: {len(unmatched)}")
     if unmatched:
         print("最初の3件:")
         for i, (filepath, (start_row, end_row)) in enumerate(unmatched[:3], 1):
-            filename = filepath.split("/")[-1]
+            filename = filepath.rpartition("/")[2]
             print(f"{i}. {filename} (行 {start_row}-{end_row})")
     
     # マッチ率の計算
-    if results:
-        match_rate = (matched_count / len(results)) * 100
+    if total_count:
+        match_rate = (matched_count / total_count) * 100
         print(f"\n--- マッチ率 ---")
-        print(f"{match_rate:.1f}% ({matched_count}/{len(results)})")
+        print(f"{match_rate:.1f}% ({matched_count}/{total_count})")
     
     # マッチした関数の詳細情報を表示
     if matched_ids:
         print(f"\n--- マッチした関数の詳細（最初の3個）---")
+        # ファイル名はファイルごとに一度だけ取り出しておく
+        basenames = {file_id: os.path.basename(filepath) for file_id, filepath in jelly_obj.files.items()}
         for func_id in matched_ids[:3]:
             loc = jelly_obj.functions[func_id]
-            filepath = jelly_obj.files[loc.fileid]
-            filename = Path(filepath).name
+            filename = basenames[loc.fileid]
             print(f"FunctionID {func_id}:")
             print(f"  ファイル: {filename}")
             print(f"  行範囲: {loc.startrow}-{loc.endrow}")
             print(f"  位置: ({loc.startcolumn}, {loc.endcolumn})")
+    
+    # "./"や連続した"/"を含むパスも、正規化して同じ関数に紐付けられる
+    print(f"\n--- テスト4: 表記の異なるパスの紐付け ---")
+    filepath, rows, func_id = first_matched
+    relative_path = filepath.lstrip("/")
+    variants = [
+        "./" + relative_path,
+        relative_path.replace("/", "//"),
+        relative_path.replace("/", "/./"),
+    ]
+    variant_results = match_codeql_to_jelly(
+        CodeQLFunction(function=[(variant, rows) for variant in variants]), jelly_obj
+    )
+    for variant, _, variant_func_id in variant_results:
+        print(f"{variant}: FunctionID {variant_func_id}")
+        assert variant_func_id == func_id
 
 
-if __name__ == "__main__":
-    main()
+def test_match_codeql_helpers(jelly, sample_dir):
+    jelly_obj = jelly.obj
+    ql_csv = sample_dir / "ql_result.csv"
+    
+    # 各ヘルパーは紐付け結果をマッチ・未マッチに振り分けたものと一致する
+    results = load_and_match_codeql(ql_csv, jelly_obj)
+    assert get_matched_function_ids(ql_csv, jelly_obj) == [
+        func_id for _, _, func_id in results if func_id is not None
+    ]
+    assert get_unmatched_functions(ql_csv, jelly_obj) == [
+        (filepath, rows) for filepath, rows, func_id in results if func_id is None
+    ]
+    print(f"✅ {len(results)}件の紐付け結果とヘルパーの結果が一致")
+
+
+def test_parse_ql_csv(sample_dir, tmp_path):
+    ql_csv = sample_dir / "ql_result.csv"
+    
+    # 同じファイルは一度だけ解析され、同じ結果が共有される
+    rows = parse_ql_csv(ql_csv)
+    assert parse_ql_csv(ql_csv) is rows
+    assert list(rows) == list(iter_codeql_rows(ql_csv))
+    assert load_codeql(ql_csv).function == list(rows)
+    
+    # ファイルが変更された場合は読み直す
+    copied = tmp_path / "ql_result.csv"
+    copied.write_bytes(ql_csv.read_bytes())
+    first = parse_ql_csv(copied)
+    with open(copied, "a", encoding="utf-8") as f:
+        f.write('"f","","","","/extra.js","1","1","9","1"\n')
+    second = parse_ql_csv(copied)
+    print(f"変更前: {len(first)}件, 変更後: {len(second)}件")
+    assert second[:-1] == first
+    assert second[-1] == ("/extra.js", (1, 9))
@@ -3,13 +3,12 @@ match_function関数のテスト
 """
 
 from pathlib import Path
-from jelly_graph.weight.mapping import load_jelly
-from jelly_graph.find import match_function
+from jelly_graph.find.match import match_function
 
 
-def main():
-    # サンプルデータの読み込み
-    jelly_obj = load_jelly("sample/jelly_result_single.json")
+def test_match_function(jelly):
+    # サンプルデータ（conftest.pyのフィクスチャで一度だけ読み込み済み）
+    jelly_obj = jelly.obj
     
     print("=== match_function テスト ===\n")
     
@@ -26,7 +25,7 @@ def main():
     
     # テスト1: 最初の関数を検索
     if jelly_obj.functions:
-        first_func_id = list(jelly_obj.functions.keys())[0]
+        first_func_id = next(iter(jelly_obj.functions))
         first_loc = jelly_obj.functions[first_func_id]
         first_filepath = jelly_obj.files[first_loc.fileid]
         
@@ -40,31 +39,39 @@ def main():
             first_loc.endrow
         )
         
-        if result == first_func_id:
-            print(f"✅ 成功: FunctionID {result} を発見")
-        else:
-            print(f"❌ 失敗: 期待 {first_func_id}, 取得 {result}")
+        assert result == first_func_id, f"期待 {first_func_id}, 取得 {result}"
+        print(f"✅ 成功: FunctionID {result} を発見")
     
     # テスト2: 存在しないファイルパス
     print(f"\n--- テスト2: 存在しないファイルパス ---")
     result = match_function(jelly_obj, "/nonexistent/file.py", 1, 10)
-    if result is None:
-        print("✅ 成功: None を返した")
-    else:
-        print(f"❌ 失敗: {result} を返した（None が期待される）")
+    assert result is None, f"{result} を返した（None が期待される）"
+    print("✅ 成功: None を返した")
     
     # テスト3: 存在しない行範囲
     if jelly_obj.functions:
-        first_loc = jelly_obj.functions[list(jelly_obj.functions.keys())[0]]
+        first_loc = jelly_obj.functions[next(iter(jelly_obj.functions))]
         first_filepath = jelly_obj.files[first_loc.fileid]
         
         print(f"\n--- テスト3: 存在しない行範囲 ---")
         result = match_function(jelly_obj, first_filepath, 99999, 99999)
-        if result is None:
-            print("✅ 成功: None を返した")
-        else:
-            print(f"❌ 失敗: {result} を返した（None が期待される）")
+        assert result is None, f"{result} を返した（None が期待される）"
+        print("✅ 成功: None を返した")
 
 
-if __name__ == "__main__":
-    main()
+def test_match_function_all(jelly):
+    jelly_obj = jelly.obj
+    
+    # すべての関数が自身の位置で見つかる（同じ位置の関数が複数ある場合は最初の関数ID）
+    first_at: dict = {}
+    for func_id, loc in jelly_obj.functions.items():
+        first_at.setdefault((loc.fileid, loc.startrow, loc.endrow), func_id)
+    
+    for func_id, loc in jelly_obj.functions.items():
+        filepath = jelly_obj.files[loc.fileid]
+        result = match_function(jelly_obj, filepath, loc.startrow, loc.endrow)
+        assert result == first_at[(loc.fileid, loc.startrow, loc.endrow)]
+        # 行範囲がずれている場合は見つからない
+        assert match_function(jelly_obj, filepath, loc.startrow, loc.endrow + 100000) is None
+    
+    print(f"✅ {len(jelly_obj.functions)}関数すべてが索引から見つかった")
@@ -0,0 +1,92 @@
+"""compute_path_stats_to_roots 関数のテストスクリプト"""
+import random
+
+import networkx as nx
+
+from jelly_graph.graph.trace import compute_path_stats_to_roots, search_src
+from jelly_graph.classes.jelly import FunctionID
+from jelly_graph.classes.trace import PathStats
+
+
+def _enumerated_stats(graph, jelly_obj, target_func_id, max_depth) -> dict[FunctionID, PathStats]:
+    """search_srcで列挙した経路から根ノードごとの集計情報を作成"""
+    paths_by_root: dict[FunctionID, list] = {}
+    for path_info in search_src(graph, jelly_obj, target_func_id, max_depth):
+        paths_by_root.setdefault(path_info.root_node, []).append(path_info)
+    
+    stats: dict[FunctionID, PathStats] = {}
+    for root, paths in paths_by_root.items():
+        weights = [p.total_weight for p in paths]
+        lengths = [len(p.path) for p in paths]
+        stats[root] = PathStats(
+            count=len(paths),
+            weight_sum=sum(weights),
+            min_weight=min(weights),
+            max_weight=max(weights),
+            length_sum=sum(lengths),
+            min_length=min(lengths),
+            max_length=max(lengths),
+        )
+    return stats
+
+
+def test_path_stats_small_dag(jelly):
+    # 根ノード1・2から関数6までの経路を持つ小さなDAG
+    #   1 -> 3 -> 5 -> 6,  1 -> 4 -> 5,  2 -> 4,  2 -> 6
+    graph = nx.DiGraph()
+    graph.add_weighted_edges_from([
+        (1, 3, 2), (1, 4, 1), (2, 4, 3), (2, 6, 5),
+        (3, 5, 1), (4, 5, 4), (5, 6, 2),
+    ])
+    
+    print("=== compute_path_stats_to_roots テスト（小さなDAG） ===")
+    stats = compute_path_stats_to_roots(graph, FunctionID(6))
+    for root, root_stats in sorted(stats.items()):
+        print(f"根ノード {root}: {root_stats}")
+    
+    # 根ノード1: 1-3-5-6 (重み5), 1-4-5-6 (重み7)
+    # 根ノード2: 2-4-5-6 (重み9), 2-6 (重み5)
+    assert stats == {
+        1: PathStats(count=2, weight_sum=12, min_weight=5, max_weight=7,
+                     length_sum=8, min_length=4, max_length=4),
+        2: PathStats(count=2, weight_sum=14, min_weight=5, max_weight=9,
+                     length_sum=6, min_length=2, max_length=4),
+    }
+    assert stats == _enumerated_stats(graph, jelly.obj, FunctionID(6), 100)
+    
+    # 最長の経路がmax_depthを超える場合、循環がある場合は列挙に任せる（None）
+    assert compute_path_stats_to_roots(graph, FunctionID(6), max_depth=3) is None
+    graph.add_edge(6, 3, weight=1)
+    assert compute_path_stats_to_roots(graph, FunctionID(6)) is None
+    print("✅ 列挙した経路の集計と一致")
+
+
+def test_path_stats_random_dags(jelly):
+    rng = random.Random(0)
+    checked = 0
+    
+    for _ in range(200):
+        n_nodes = rng.randint(1, 12)
+        graph = nx.DiGraph()
+        graph.add_nodes_from(range(n_nodes))
+        for _ in range(rng.randint(0, 2 * n_nodes)):
+            if n_nodes < 2:
+                break
+            # 番号の小さいノードから大きいノードへのエッジだけを張る（非循環）
+            src, dst = sorted(rng.sample(range(n_nodes), 2))
+            graph.add_edge(src, dst, weight=rng.randint(1, 9))
+        
+        target = FunctionID(rng.randrange(n_nodes))
+        max_depth = rng.randint(1, 8)
+        stats = compute_path_stats_to_roots(graph, target, max_depth)
+        if stats is None:
+            # 最長の経路がmax_depthを超える場合のみ列挙に任せる
+            ancestors = graph.subgraph(nx.ancestors(graph, target) | {target})
+            assert nx.dag_longest_path_length(ancestors) + 1 > max_depth
+            continue
+        
+        assert stats == _enumerated_stats(graph, jelly.obj, target, max_depth)
+        checked += 1
+    
+    print(f"✅ {checked}件のランダムなDAGで列挙した経路の集計と一致")
+    assert checked > 0
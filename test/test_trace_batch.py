@@ -0,0 +1,88 @@
+"""search_src_batch・search_dst_batch と build_csr のテストスクリプト"""
+import random
+
+import networkx as nx
+
+from jelly_graph.graph.csr import build_csr
+from jelly_graph.graph.trace import (
+    build_trace_index,
+    search_src,
+    search_dst,
+    search_src_batch,
+    search_dst_batch,
+)
+from jelly_graph.classes.jelly import FunctionID
+
+# 経路の列挙が組合せ爆発しないよう探索深度を制限する
+MAX_DEPTH = 8
+
+
+def _random_graph(seed: int, n_nodes: int = 25, n_edges: int = 45) -> nx.DiGraph:
+    """循環を含む重み付きのランダムな有向グラフ"""
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(FunctionID(node) for node in range(n_nodes))
+    while graph.number_of_edges() < n_edges:
+        src, dst = rng.sample(range(n_nodes), 2)
+        graph.add_edge(FunctionID(src), FunctionID(dst), weight=rng.randint(1, 5))
+    return graph
+
+
+def test_build_csr(jelly):
+    graph = jelly.graph
+    node_ids, forward, reverse = build_csr(graph)
+    
+    print("=== build_csr テスト ===")
+    print(f"ノード数: {len(node_ids)}, エッジ数: {len(forward.indices)}")
+    
+    assert node_ids == list(graph.nodes())
+    assert len(forward.indices) == len(reverse.indices) == graph.number_of_edges()
+    
+    # 各行の隣接ノードと重みは successors / predecessors と同じ順序で並ぶ
+    for csr, adjacency in ((forward, graph.succ), (reverse, graph.pred)):
+        indptr, indices, weights = csr.rows
+        for i, node in enumerate(node_ids):
+            row = range(indptr[i], indptr[i + 1])
+            assert [node_ids[indices[pos]] for pos in row] == list(adjacency[node])
+            assert [weights[pos] for pos in row] == [
+                data["weight"] for data in adjacency[node].values()
+            ]
+    
+    print("✅ CSRの隣接関係がグラフと一致")
+
+
+def test_search_batch(jelly):
+    # サンプルデータ（conftest.pyのフィクスチャで一度だけ読み込み済み）
+    jelly_obj = jelly.obj
+    index = build_trace_index(jelly.graph)
+    targets = list(index.node_ids)
+    
+    print("=== search_src_batch / search_dst_batch テスト ===")
+    src_results = search_src_batch(index, jelly_obj, targets, MAX_DEPTH, max_workers=2)
+    dst_results = search_dst_batch(index, jelly_obj, targets, MAX_DEPTH, max_workers=2)
+    
+    # 結果は開始関数IDの順に並び、1件ずつ探索した場合と一致する
+    assert list(src_results) == targets
+    assert list(dst_results) == targets
+    for target in targets:
+        assert src_results[target] == search_src(index, jelly_obj, target, MAX_DEPTH)
+        assert dst_results[target] == search_dst(index, jelly_obj, target, MAX_DEPTH)
+    
+    print(f"✅ {len(targets)}関数の一括探索結果が search_src / search_dst と一致")
+
+
+def test_search_batch_random_graphs(jelly):
+    jelly_obj = jelly.obj
+    
+    for seed in range(5):
+        graph = _random_graph(seed)
+        targets = list(graph)
+        
+        src_results = search_src_batch(graph, jelly_obj, targets, MAX_DEPTH, max_workers=2)
+        dst_results = search_dst_batch(graph, jelly_obj, targets, MAX_DEPTH, max_workers=2)
+        
+        for target in targets:
+            assert src_results[target] == search_src(graph, jelly_obj, target, MAX_DEPTH)
+            assert dst_results[target] == search_dst(graph, jelly_obj, target, MAX_DEPTH)
+        
+        print(f"seed {seed}: ✅ 一致")
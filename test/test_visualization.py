@@ -1,117 +1,149 @@
 """グラフ画像出力のテストスクリプト"""
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from jelly_graph.weight.mapping import load_jelly
-from jelly_graph.weight.weight import dependency_weights
-from jelly_graph.graph.build_callgraph import (
-    build_callgraph,
-    build_meta_callgraph,
-)
+from jelly_graph.graph import plot
+from jelly_graph.graph.build_callgraph import build_meta_callgraph
 from jelly_graph.graph.plot import (
+    compute_layout,
     save_callgraph_image,
     save_callgraph_with_metadata,
     save_subgraph_by_function,
 )
 from jelly_graph.classes.jelly import FunctionID
 
-# 出力ディレクトリを作成
-output_dir = Path(__file__).parents[1] / "output"
-output_dir.mkdir(exist_ok=True)
-
-# サンプルJSONファイルを読み込み
-sample_file = Path(__file__).parents[1] / "sample" / "jelly_result_single.json"
-jelly_obj = load_jelly(sample_file)
 
-print("=== Jelly データ読み込み完了 ===")
-print(f"ファイル数: {len(jelly_obj.files)}")
-print(f"関数数: {len(jelly_obj.functions)}")
+def test_visualization(jelly):
+    # 出力ディレクトリを作成
+    output_dir = Path(__file__).parents[1] / "output"
+    output_dir.mkdir(exist_ok=True)
+    
+    # サンプルデータ（conftest.pyのフィクスチャで一度だけ読み込み済み）
+    jelly_obj = jelly.obj
+    depend_map = jelly.dm
+    graph = jelly.graph
+    
+    print("=== Jelly データ読み込み完了 ===")
+    print(f"ファイル数: {len(jelly_obj.files)}")
+    print(f"関数数: {len(jelly_obj.functions)}")
+    
+    # グラフを構築
+    print("\n=== コールグラフ構築中... ===")
+    # エッジは構築済みのgraphを使い回し、ノード属性だけを付ける
+    graph_with_meta = build_meta_callgraph(depend_map, jelly_obj, base=graph)
+    
+    # Springレイアウトは3つの画像で共通のため、一度だけ計算して使い回す
+    spring_pos = compute_layout(graph, "spring")
+    assert spring_pos.keys() == set(graph.nodes())
+    
+    # 各画像は独立しているため、(説明, 関数, 引数, キーワード引数) にまとめてプロセスに分散して出力する
+    jobs = [
+        # 1. 基本的なコールグラフを出力
+        (
+            "1. 基本コールグラフ（Spring レイアウト）",
+            save_callgraph_image,
+            (graph, output_dir / "callgraph_spring.png"),
+            dict(pos=spring_pos, title="コールグラフ - Spring レイアウト"),
+        ),
+        (
+            "2. 基本コールグラフ（Circular レイアウト）",
+            save_callgraph_image,
+            (graph, output_dir / "callgraph_circular.png"),
+            dict(layout="circular", title="コールグラフ - Circular レイアウト"),
+        ),
+        (
+            "3. 基本コールグラフ（Kamada-Kawai レイアウト）",
+            save_callgraph_image,
+            (graph, output_dir / "callgraph_kamada.png"),
+            dict(layout="kamada_kawai", title="コールグラフ - Kamada-Kawai レイアウト"),
+        ),
+        # 2. メタデータ付きコールグラフを出力
+        (
+            "4. メタデータ付きコールグラフ",
+            save_callgraph_with_metadata,
+            (graph_with_meta, jelly_obj, output_dir / "callgraph_with_metadata.png"),
+            dict(layout="spring", title="コールグラフ（ファイル名付き）"),
+        ),
+        # 3. 特定の関数を中心としたサブグラフを出力
+        (
+            "5. 関数14を中心としたサブグラフ（深さ2）",
+            save_subgraph_by_function,
+            (graph_with_meta, jelly_obj, FunctionID(14), output_dir / "subgraph_func14_depth2.png"),
+            dict(depth=2),
+        ),
+        (
+            "6. 関数17を中心としたサブグラフ（深さ1）",
+            save_subgraph_by_function,
+            (graph_with_meta, jelly_obj, FunctionID(17), output_dir / "subgraph_func17_depth1.png"),
+            dict(depth=1),
+        ),
+        # 4. 高解像度版を出力
+        # （PDFはベクター形式でラスタ画像を含まないため、dpiを上げても解像度は変わらない）
+        (
+            "7. 高解像度コールグラフ（PDF形式）",
+            save_callgraph_image,
+            (graph, output_dir / "callgraph_high_res.pdf"),
+            dict(pos=spring_pos, figsize=(20, 16), dpi=100, title="高解像度コールグラフ"),
+        ),
+        # 5. 重みラベルなしバージョン
+        (
+            "8. シンプル版（重みラベルなし）",
+            save_callgraph_image,
+            (graph, output_dir / "callgraph_simple.png"),
+            dict(pos=spring_pos, show_weights=False, title="コールグラフ（シンプル版）"),
+        ),
+    ]
+    
+    print("\n=== 画像出力中... ===")
+    with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as executor:
+        futures = [executor.submit(func, *args, **kwargs) for _, func, args, kwargs in jobs]
+        for (label, _, _, _), future in zip(jobs, futures):
+            # ワーカーで発生した例外はresult()で再送出される
+            future.result()
+            print(f"{label}...")
+    
+    expected_files = [
+        "callgraph_spring.png",
+        "callgraph_circular.png",
+        "callgraph_kamada.png",
+        "callgraph_with_metadata.png",
+        "subgraph_func14_depth2.png",
+        "subgraph_func17_depth1.png",
+        "callgraph_high_res.pdf",
+        "callgraph_simple.png",
+    ]
+    for name in expected_files:
+        assert (output_dir / name).stat().st_size > 0, name
+    
+    print(f"\n✅ すべての画像を {output_dir} に出力しました！")
+    print(f"\n出力されたファイル:")
+    for file in sorted(output_dir.glob("*")):
+        print(f"  - {file.name}")
 
-# 依存関係の重みを計算
-print("\n=== 依存関係の重み計算中... ===")
-depend_map = dependency_weights(jelly_obj)
 
-# グラフを構築
-print("\n=== コールグラフ構築中... ===")
-graph = build_callgraph(depend_map)
-graph_with_meta = build_meta_callgraph(depend_map, jelly_obj)
+def test_visualization_many_edges(jelly, tmp_path, monkeypatch):
+    # エッジ数の上限を0にして、矢印を省いた一括描画の経路を通す
+    monkeypatch.setattr(plot, "_MAX_ARROW_EDGES", 0)
+    output_path = tmp_path / "callgraph_lines.png"
+    save_callgraph_image(jelly.graph, output_path, layout="circular", dpi=50)
+    assert output_path.stat().st_size > 0
+    print(f"✅ {jelly.graph.number_of_edges()}エッジを線分の一括描画で出力")
 
-# 1. 基本的なコールグラフを出力
-print("\n=== 画像出力中... ===")
-print("1. 基本コールグラフ（Spring レイアウト）...")
-save_callgraph_image(
-    graph,
-    output_dir / "callgraph_spring.png",
-    layout="spring",
-    title="コールグラフ - Spring レイアウト",
-)
-
-print("2. 基本コールグラフ（Circular レイアウト）...")
-save_callgraph_image(
-    graph,
-    output_dir / "callgraph_circular.png",
-    layout="circular",
-    title="コールグラフ - Circular レイアウト",
-)
-
-print("3. 基本コールグラフ（Kamada-Kawai レイアウト）...")
-save_callgraph_image(
-    graph,
-    output_dir / "callgraph_kamada.png",
-    layout="kamada_kawai",
-    title="コールグラフ - Kamada-Kawai レイアウト",
-)
-
-# 2. メタデータ付きコールグラフを出力
-print("4. メタデータ付きコールグラフ...")
-save_callgraph_with_metadata(
-    graph_with_meta,
-    jelly_obj,
-    output_dir / "callgraph_with_metadata.png",
-    layout="spring",
-    title="コールグラフ（ファイル名付き）",
-)
-
-# 3. 特定の関数を中心としたサブグラフを出力
-print("5. 関数14を中心としたサブグラフ（深さ2）...")
-save_subgraph_by_function(
-    graph_with_meta,
-    jelly_obj,
-    FunctionID(14),
-    output_dir / "subgraph_func14_depth2.png",
-    depth=2,
-)
-
-print("6. 関数17を中心としたサブグラフ（深さ1）...")
-save_subgraph_by_function(
-    graph_with_meta,
-    jelly_obj,
-    FunctionID(17),
-    output_dir / "subgraph_func17_depth1.png",
-    depth=1,
-)
-
-# 4. 高解像度版を出力
-print("7. 高解像度コールグラフ（PDF形式）...")
-save_callgraph_image(
-    graph,
-    output_dir / "callgraph_high_res.pdf",
-    layout="spring",
-    figsize=(20, 16),
-    dpi=600,
-    title="高解像度コールグラフ",
-)
-
-# 5. 重みラベルなしバージョン
-print("8. シンプル版（重みラベルなし）...")
-save_callgraph_image(
-    graph,
-    output_dir / "callgraph_simple.png",
-    layout="spring",
-    show_weights=False,
-    title="コールグラフ（シンプル版）",
-)
 
-print(f"\n✅ すべての画像を {output_dir} に出力しました！")
-print(f"\n出力されたファイル:")
-for file in sorted(output_dir.glob("*")):
-    print(f"  - {file.name}")
+def test_visualization_reuse_axes(jelly, tmp_path):
+    import matplotlib.pyplot as plt
+    
+    # 1つの図を使い回して複数の画像を出力する（図は呼び出し側で閉じる）
+    fig, ax = plt.subplots(figsize=(12, 10))
+    try:
+        for layout in ("spring", "circular", "kamada_kawai"):
+            ax.clear()
+            output_path = tmp_path / f"callgraph_{layout}.png"
+            save_callgraph_image(jelly.graph, output_path, layout=layout, dpi=50, ax=ax)
+            assert output_path.stat().st_size > 0
+            # 渡した図は閉じられず、新しい図も作られない
+            assert plt.get_fignums() == [fig.number]
+    finally:
+        plt.close(fig)
+    print("✅ 1つの図で3つの画像を出力")
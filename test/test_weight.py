@@ -1,83 +1,224 @@
 """weight.pyのテストスクリプト"""
+import os
 import sys
+from collections import Counter
 from pathlib import Path
 
 # srcディレクトリをパスに追加
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+import numpy as np
+
 from jelly_graph.weight.mapping import load_jelly
 from jelly_graph.weight.weight import (
     dependency_weights,
+    find_src_function,
+    find_src_functions,
+    count_dependency_pairs,
     get_dependency,
     get_total_dependencies,
     get_total_calls,
     get_caller_dependencies,
     get_callee_dependencies,
     get_top_dependencies,
+    get_top_caller_dependencies,
+    get_top_callee_dependencies,
 )
-from jelly_graph.classes.jelly import FunctionID
+from jelly_graph.classes.jelly import dependMap, FunctionColumns, FunctionID, location
 
-# サンプルJSONファイルを読み込み
-sample_file = Path(__file__).parents[1] / "sample" / "jelly_result_single.json"
-jelly_obj = load_jelly(sample_file)
 
-print("=== Jelly データ読み込み完了 ===")
-print(f"ファイル数: {len(jelly_obj.files)}")
-print(f"関数数: {len(jelly_obj.functions)}")
-print(f"呼び出し数: {len(jelly_obj.calls)}")
-print(f"call2fun エッジ数: {len(jelly_obj.call2fun)}")
+def test_weight(jelly):
+    # サンプルデータ（conftest.pyのフィクスチャで一度だけ読み込み済み）
+    jelly_obj = jelly.obj
+    depend_map = jelly.dm
+    
+    print("=== Jelly データ読み込み完了 ===")
+    print(f"ファイル数: {len(jelly_obj.files)}")
+    print(f"関数数: {len(jelly_obj.functions)}")
+    print(f"呼び出し数: {len(jelly_obj.calls)}")
+    print(f"call2fun エッジ数: {len(jelly_obj.call2fun)}")
+    
+    # 統計情報を表示
+    print(f"\n総依存関係数（ユニークなペア）: {get_total_dependencies(depend_map)}")
+    print(f"総呼び出し回数: {get_total_calls(depend_map)}")
+    assert get_total_dependencies(depend_map) == len(depend_map.dependMap)
+    assert get_total_calls(depend_map) == sum(depend_map.dependMap.values())
+    # 疎行列の非ゼロ要素は依存関係のペアと1対1に対応する
+    assert depend_map.caller_matrix.nnz == get_total_dependencies(depend_map)
+    assert depend_map.callee_matrix.sum() == get_total_calls(depend_map)
+    # 呼び出し回数はcall2funのうち呼び出し元の関数が見つかったエッジの数を超えない
+    assert get_total_calls(depend_map) <= len(jelly_obj.call2fun)
+    
+    # 呼び出し回数の多い依存関係トップ10を表示
+    print("\n=== 呼び出し回数トップ10 ===")
+    top_deps = get_top_dependencies(depend_map, top_n=10)
+    assert len(top_deps) == min(10, len(depend_map.dependMap))
+    assert [count for _, _, count in top_deps] == sorted(
+        (count for _, _, count in top_deps), reverse=True
+    )
+    assert top_deps[0][2] == max(depend_map.dependMap.values())
+    
+    # ファイル名はファイルごとに一度だけ取り出しておく
+    basenames = {file_id: os.path.basename(filepath) for file_id, filepath in jelly_obj.files.items()}
+    
+    def function_file_name(func_id: FunctionID) -> str:
+        loc = jelly_obj.functions.get(func_id)
+        return basenames.get(loc.fileid, "不明") if loc else "不明"
+    
+    for i, (caller_id, callee_id, count) in enumerate(top_deps, 1):
+        print(f"{i}. 関数 {caller_id} -> 関数 {callee_id}: {count}回")
+        print(f"   呼び出し元: {function_file_name(caller_id)}")
+        print(f"   呼び出し先: {function_file_name(callee_id)}")
+    
+    # 特定の関数の依存関係を調査（例：関数14）
+    test_func_id = FunctionID(14)
+    if test_func_id in jelly_obj.functions:
+        print(f"\n=== 関数 {test_func_id} の依存関係 ===")
+        
+        # この関数が呼び出す関数
+        caller_deps = get_caller_dependencies(depend_map, test_func_id)
+        assert caller_deps == {
+            dst: count for (src, dst), count in depend_map.dependMap.items() if src == test_func_id
+        }
+        if caller_deps:
+            print(f"関数 {test_func_id} が呼び出す関数:")
+            top_callees = get_top_caller_dependencies(depend_map, test_func_id, top_n=len(caller_deps))
+            assert top_callees == sorted(caller_deps.items(), key=lambda x: x[1], reverse=True)
+            for callee, count in top_callees:
+                print(f"  -> 関数 {callee}: {count}回")
+        else:
+            print(f"関数 {test_func_id} は他の関数を呼び出していません")
+        
+        # この関数を呼び出す関数
+        callee_deps = get_callee_dependencies(depend_map, test_func_id)
+        assert callee_deps == {
+            src: count for (src, dst), count in depend_map.dependMap.items() if dst == test_func_id
+        }
+        if callee_deps:
+            print(f"\n関数 {test_func_id} を呼び出す関数:")
+            top_callers = get_top_callee_dependencies(depend_map, test_func_id, top_n=len(callee_deps))
+            assert top_callers == sorted(callee_deps.items(), key=lambda x: x[1], reverse=True)
+            for caller, count in top_callers:
+                print(f"  関数 {caller} -> : {count}回")
+        else:
+            print(f"\n関数 {test_func_id} を呼び出す関数はありません")
+    
+    # 特定の依存関係の強さをチェック
+    print("\n=== 特定の依存関係の例 ===")
+    example_pairs = [(FunctionID(14), FunctionID(1)), (FunctionID(14), FunctionID(10)), (FunctionID(17), FunctionID(1))]
+    for caller, callee in example_pairs:
+        strength = get_dependency(depend_map, caller, callee)
+        assert strength == depend_map.dependMap.get((caller, callee), 0)
+        if strength > 0:
+            print(f"関数 {caller} -> 関数 {callee}: {strength}回")
+    
+    print("\n✅ 依存関係の重み計算完了！")
 
-# 依存関係の重みを計算
-print("\n=== 依存関係の重み計算中... ===")
-depend_map = dependency_weights(jelly_obj)
 
-# 統計情報を表示
-print(f"\n総依存関係数（ユニークなペア）: {get_total_dependencies(depend_map)}")
-print(f"総呼び出し回数: {get_total_calls(depend_map)}")
+def test_dependency_weights(jelly, sample_dir):
+    # 重み計算自体のテストのため、キャッシュを使わずにJSONから読み込んで計算する
+    jelly_obj = load_jelly(sample_dir / "jelly_result_single.json")
+    depend_map = dependency_weights(jelly_obj)
+    
+    # 呼び出しごとにfind_src_functionで呼び出し元を特定して数えた結果と一致する
+    # （位置情報のない呼び出し・呼び出し元が見つからない呼び出しは数えない）
+    expected: Counter[tuple[FunctionID, FunctionID]] = Counter()
+    for call_id, dst_id in jelly_obj.call2fun.tolist():
+        call_loc = jelly_obj.calls.get(call_id)
+        if call_loc is None:
+            continue
+        src_id = find_src_function(call_loc, jelly_obj.functions)
+        if src_id is not None:
+            expected[(src_id, dst_id)] += 1
+    
+    print("=== dependency_weights テスト ===")
+    print(f"依存関係数: {len(depend_map.dependMap)}, 呼び出し回数: {sum(depend_map.dependMap.values())}")
+    assert expected
+    assert depend_map.dependMap == dict(expected)
+    # ペアは最初に出現した順に並ぶ
+    assert list(depend_map.dependMap) == list(expected)
+    
+    # 他のテストが使うフィクスチャ（キャッシュから読み込んだもの）と一致する
+    assert depend_map == jelly.dm
+    print("✅ 呼び出しごとに数えた結果と一致")
 
-# 呼び出し回数の多い依存関係トップ10を表示
-print("\n=== 呼び出し回数トップ10 ===")
-top_deps = get_top_dependencies(depend_map, top_n=10)
-for i, (caller_id, callee_id, count) in enumerate(top_deps, 1):
-    caller_loc = jelly_obj.functions.get(caller_id)
-    callee_loc = jelly_obj.functions.get(callee_id)
-    
-    caller_file = jelly_obj.files.get(caller_loc.fileid) if caller_loc else "不明"
-    callee_file = jelly_obj.files.get(callee_loc.fileid) if callee_loc else "不明"
-    
-    print(f"{i}. 関数 {caller_id} -> 関数 {callee_id}: {count}回")
-    print(f"   呼び出し元: {Path(caller_file).name if caller_file != '不明' else caller_file}")
-    print(f"   呼び出し先: {Path(callee_file).name if callee_file != '不明' else callee_file}")
 
-# 特定の関数の依存関係を調査（例：関数14）
-test_func_id = FunctionID(14)
-if test_func_id in jelly_obj.functions:
-    print(f"\n=== 関数 {test_func_id} の依存関係 ===")
-    
-    # この関数が呼び出す関数
-    caller_deps = get_caller_dependencies(depend_map, test_func_id)
-    if caller_deps:
-        print(f"関数 {test_func_id} が呼び出す関数:")
-        for callee, count in sorted(caller_deps.items(), key=lambda x: x[1], reverse=True):
-            print(f"  -> 関数 {callee}: {count}回")
-    else:
-        print(f"関数 {test_func_id} は他の関数を呼び出していません")
-    
-    # この関数を呼び出す関数
-    callee_deps = get_callee_dependencies(depend_map, test_func_id)
-    if callee_deps:
-        print(f"\n関数 {test_func_id} を呼び出す関数:")
-        for caller, count in sorted(callee_deps.items(), key=lambda x: x[1], reverse=True):
-            print(f"  関数 {caller} -> : {count}回")
-    else:
-        print(f"\n関数 {test_func_id} を呼び出す関数はありません")
+def test_find_src_functions(jelly):
+    # サンプルデータ（conftest.pyのフィクスチャで一度だけ読み込み済み）
+    jelly_obj = jelly.obj
+    
+    # サンプルの呼び出しに、入れ子の関数・同じ範囲の関数・どの関数にも含まれない呼び出しを加える
+    functions = dict(jelly_obj.functions)
+    first_loc = next(iter(functions.values()))
+    next_id = FunctionID(max(functions) + 1)
+    functions[next_id] = location(first_loc.fileid, first_loc.startrow + 1, 1, first_loc.startrow + 3, 1)
+    functions[FunctionID(next_id + 1)] = functions[next_id]
+    call_locs = list(jelly_obj.calls.values()) + [
+        location(first_loc.fileid, first_loc.startrow + 2, 1, first_loc.startrow + 2, 5),
+        location(first_loc.fileid, 99999, 1, 99999, 5),
+        location(len(jelly_obj.files), 1, 1, 1, 5),
+    ]
+    
+    print("=== find_src_functions テスト ===")
+    src_ids = find_src_functions(
+        np.array([loc.fileid for loc in call_locs]),
+        np.array([loc.startrow for loc in call_locs]),
+        np.array([loc.endrow for loc in call_locs]),
+        functions,
+    )
+    
+    # 1件ずつ判定した結果と一致する（見つからない場合は-1）
+    expected = [find_src_function(loc, functions) for loc in call_locs]
+    assert src_ids.tolist() == [-1 if func_id is None else func_id for func_id in expected]
+    assert src_ids[-3] == next_id  # 入れ子の関数（範囲が狭い方・先に登録された方）
+    assert src_ids[-2] == -1
+    assert src_ids[-1] == -1
+    print(f"✅ {len(call_locs)}件の呼び出しで find_src_function と一致")
+    
+    # 列ごとの配列を渡しても同じ結果になる
+    columns = FunctionColumns.from_locations(functions)
+    assert columns.func_id.tolist() == list(functions)
+    assert columns.startrow.tolist() == [loc.startrow for loc in functions.values()]
+    assert columns.endcolumn.tolist() == [loc.endcolumn for loc in functions.values()]
+    src_ids_by_columns = find_src_functions(
+        np.array([loc.fileid for loc in call_locs]),
+        np.array([loc.startrow for loc in call_locs]),
+        np.array([loc.endrow for loc in call_locs]),
+        columns,
+    )
+    assert np.array_equal(src_ids_by_columns, src_ids)
+    print("✅ FunctionColumnsでも一致")
 
-# 特定の依存関係の強さをチェック
-print("\n=== 特定の依存関係の例 ===")
-example_pairs = [(FunctionID(14), FunctionID(1)), (FunctionID(14), FunctionID(10)), (FunctionID(17), FunctionID(1))]
-for caller, callee in example_pairs:
-    strength = get_dependency(depend_map, caller, callee)
-    if strength > 0:
-        print(f"関数 {caller} -> 関数 {callee}: {strength}回")
 
-print("\n✅ 依存関係の重み計算完了！")
+def test_count_dependency_pairs():
+    src_ids = np.array([3, 1, 3, 2, 1, 3])
+    dst_ids = np.array([4, 2, 4, 4, 2, 5])
+    
+    print("=== count_dependency_pairs テスト ===")
+    pairs, counts = count_dependency_pairs(src_ids, dst_ids)
+    
+    # ペアは最初に出現した順に並ぶ
+    assert pairs.tolist() == [[3, 4], [1, 2], [2, 4], [3, 5]]
+    assert counts.tolist() == [2, 2, 1, 1]
+    
+    pairs, counts = count_dependency_pairs(np.array([], dtype=np.int64), np.array([], dtype=np.int64))
+    assert pairs.shape == (0, 2)
+    assert counts.shape == (0,)
+    print("✅ ペアごとの出現回数が一致")
+
+
+def test_get_top_dependencies_ties():
+    depend_map = dependMap(dependMap={(1, 2): 3, (1, 3): 5, (2, 3): 3, (3, 1): 1, (4, 1): 3})
+    
+    print("=== get_top_dependencies テスト ===")
+    # 同じ回数の依存関係は辞書中の順番に並ぶ（sorted(..., reverse=True)[:top_n]と同じ）
+    expected = sorted(
+        ((caller, callee, count) for (caller, callee), count in depend_map.dependMap.items()),
+        key=lambda x: x[2],
+        reverse=True,
+    )
+    for top_n in range(len(expected) + 2):
+        assert get_top_dependencies(depend_map, top_n) == expected[:top_n]
+    assert get_top_dependencies(depend_map, 2) == [(1, 3, 5), (1, 2, 3)]
+    assert get_top_dependencies(dependMap(dependMap={}), 3) == []
+    print("✅ 同順位の並びを含めて全件ソートと一致")